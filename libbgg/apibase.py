@@ -1,16 +1,27 @@
 
+from libbgg.errors import APICallError, CircuitOpenError
 from libbgg.infodict import InfoDict
+from libbgg.resilience import Metrics
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ThreadPoolExecutor,
+    wait as wait_futures,
+)
+from http.client import HTTPException
+from urllib.error import HTTPError
 from urllib.request import (
     build_opener,
     install_opener,
 )
 from urllib.parse import urlencode, quote
+import threading
 import time
 
 class BGGBase(object):
 
     def __init__(self, api_token, url_base='http://www.boardgamegeek.com', 
-            path_base=''):
+            path_base='', retry=None, hedge=None, breaker=None,
+            metrics=None, scheduler=None):
         """
         Set up the basic url stuff for retrieving items via the api
 
@@ -19,12 +30,31 @@ class BGGBase(object):
                             https://boardgamegeek.com/using_the_xml_api#toc10
         url_base:str        The base url, including the http:// portion
         path_base:str       The base portion of the uri
+        retry:libbgg.resilience.RetryPolicy     Retry failed calls with
+                            backoff.  Default: no retries
+        hedge:libbgg.resilience.HedgePolicy     Send hedged duplicate
+                            requests for slow calls.  Default: no hedging
+        breaker:libbgg.resilience.CircuitBreaker    Fail fast on endpoints
+                            which keep failing.  Default: no breaker
+        metrics:libbgg.resilience.Metrics       Where to record call
+                            metrics.  A new instance is created by default
+        scheduler:libbgg.scheduler.RequestScheduler     Share the request
+                            budget between priority classes.  Default: no
+                            scheduling
         """
         self.api_token = api_token
         self.url_base = url_base.rstrip('/')
         self.path_base = path_base.strip('/')
         self._base = '{}/{}'.format(self.url_base, self.path_base)
         self._opener = self._get_opener()
+        self.retry = retry
+        self.hedge = hedge
+        self.breaker = breaker
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.scheduler = scheduler
+        self._hedge_pool = None
+        self._hedge_free = None
+        self._hedge_lock = threading.Lock()
 
     def _get_opener(self):
         """
@@ -36,11 +66,11 @@ class BGGBase(object):
         install_opener(o)
         return o
 
-    def call(self, call_type, call_dict, wait=False):
+    def call(self, call_type, call_dict, wait=False, priority=None):
         """
-        This handles all of the actual calls to the bgg api.  It takes the
-        first portion of the url and appends it to the base, then builds
-        the query string from the call_dict after filtering None values.
+        This handles all of the actual calls to the bgg api.  See call_raw()
+        for the details of the request, the response body is then converted
+        to an InfoDict.
 
         call_type:str       The path addition to append to the base url
         call_dict:dict      This is a dictionary mapping to be turned into
@@ -48,10 +78,67 @@ class BGGBase(object):
         wait:bool           This will cause the api to retry if a 202 is
                             returned until a 200 is returned.  This is
                             needed for the async calls for get_collection()
+        priority:str        The scheduler priority class for the call.
+                            Default: picked by the scheduler
 
         returns InfoDict    Returns a mapping of items from the native XML
                             to a dictionary mapping
         """
+        resp_str = self.call_raw(call_type, call_dict, wait, priority)
+
+        return InfoDict.xml_to_info_dict(resp_str, strip_errors=True)
+
+    def call_many(self, calls, workers=4):
+        """
+        Perform a number of calls concurrently and return their results in
+        the same order as the calls were given.
+
+        calls:list[tuple]   A list of (call_type, call_dict) tuples, see
+                            call() for the details
+        workers:int         The maximum number of concurrent calls
+
+        returns list[InfoDict]  The results in the order of the calls
+        """
+        calls = list(calls)
+        if len(calls) <= 1 or workers <= 1:
+            return [self.call(call_type, d) for call_type, d in calls]
+
+        # A scheduler priority() block only applies to this thread, so
+        # hand it on to the pool threads explicitly
+        priority = None
+        if self.scheduler is not None:
+            priority = self.scheduler.current_priority()
+
+        with ThreadPoolExecutor(max_workers=min(workers, len(calls)),
+                thread_name_prefix='bgg-call') as pool:
+            return list(pool.map(
+                lambda c: self.call(c[0], c[1], priority=priority), calls))
+
+    def call_raw(self, call_type, call_dict, wait=False, priority=None):
+        """
+        This performs the request to the bgg api without parsing the
+        response.  It takes the first portion of the url and appends it to
+        the base, then builds the query string from the call_dict after
+        filtering None values.
+
+        call_type:str       The path addition to append to the base url
+        call_dict:dict      This is a dictionary mapping to be turned into
+                            a query string
+        wait:bool           This will cause the api to retry if a 202 is
+                            returned until a 200 is returned.  This is
+                            needed for the async calls for get_collection()
+        priority:str        The scheduler priority class for the call.
+                            Default: picked by the scheduler
+
+        returns bytes       Returns the raw XML response body
+
+        Failed calls are retried according to self.retry, slow calls are
+        hedged according to self.hedge and self.breaker is consulted
+        before each attempt.  With a scheduler, each attempt waits for a
+        slot in its priority class, as does every hedged
+        duplicate.  Once the retries are exhausted, the last
+        HTTPError, URLError or other network error is raised.
+        """
         # First, filter any None values from the list
         for key, val in list(call_dict.items()):
             if val is None:
@@ -62,11 +149,170 @@ class BGGBase(object):
             quote(call_type), 
             urlencode(call_dict),
         )
+        endpoint = call_type.split('/', 1)[0]
+        if self.scheduler is not None and priority is None:
+            # Classify in the calling thread, hedges run in other threads
+            priority = self.scheduler.classify(endpoint)
+        attempt = 0
+
+        while True:
+            if self.breaker is not None:
+                try:
+                    self.breaker.before(endpoint)
+                except CircuitOpenError:
+                    self.metrics.incr(endpoint, 'fast_fail')
+                    raise
+
+            try:
+                code, resp_str = self._open(url, endpoint, priority)
+            except APICallError:
+                # The scheduler shed the request, it was never sent
+                self.metrics.incr(endpoint, 'shed')
+                if self.breaker is not None:
+                    self.breaker.cancel(endpoint)
+                raise
+            except HTTPError as e:
+                status = e.code
+                retry_after = e.headers.get('Retry-After') if e.headers \
+                    else None
+                error = e
+            except (OSError, HTTPException) as e:
+                # urllib doesn't wrap errors from reading the response, so
+                # dropped connections show up as the raw socket or
+                # http.client errors
+                status = None
+                retry_after = None
+                error = e
+            except BaseException:
+                # Something unexpected, don't leave a trial call hanging
+                if self.breaker is not None:
+                    self.breaker.cancel(endpoint)
+                raise
+            else:
+                if self.breaker is not None:
+                    self.breaker.success(endpoint)
+
+                if wait and code == 202:
+                    self.metrics.incr(endpoint, 'wait_202')
+                    time.sleep(1)
+                    continue
+
+                return resp_str
+
+            self.metrics.incr(endpoint, 'error')
+            # Only count server side trouble against the circuit, a 404
+            # says nothing about the health of BGG
+            if self.breaker is not None:
+                if status is None or status == 429 or status >= 500:
+                    self.breaker.failure(endpoint)
+                else:
+                    self.breaker.success(endpoint)
+
+            if self.retry is None or \
+                    not self.retry.should_retry(attempt, status):
+                raise error
+            delay = self.retry.delay(attempt, retry_after)
+            if delay is None:
+                # BGG wants us to back off for longer than we are willing
+                # to wait, retrying any sooner would just be refused
+                raise error
+
+            self.metrics.incr(endpoint, 'retry')
+            time.sleep(delay)
+            attempt += 1
+
+    def _open(self, url, endpoint, priority=None):
+        """
+        Performs a single request, hedging it with a duplicate if it is
+        slower than the hedge policy allows.  With a scheduler, the request
+        waits for a slot and a hedge is only sent if a slot is free.
+
+        returns (int, bytes)    The response code and body
+        """
+        if self.scheduler is not None:
+            self.scheduler.acquire(endpoint, priority)
+
+        delay = None
+        if self.hedge is not None:
+            delay = self.hedge.delay(self.metrics, endpoint)
+        if delay is None:
+            return self._open_slot(url, endpoint)
+
+        # Only hand requests to workers which are free, a request queued
+        # behind others would look slow and set off needless hedges
+        primary = self._submit_hedge(url, endpoint)
+        if primary is None:
+            self.metrics.incr(endpoint, 'hedge_skipped')
+            return self._open_slot(url, endpoint)
+        done, _ = wait_futures([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        # The hedge counts against the request budget like any other
+        # request, skip it rather than wait if there is no room
+        if self.scheduler is not None and \
+                not self.scheduler.try_acquire(endpoint, priority):
+            self.metrics.incr(endpoint, 'hedge_skipped')
+            return primary.result()
+        hedged = self._submit_hedge(url, endpoint)
+        if hedged is None:
+            if self.scheduler is not None:
+                self.scheduler.release()
+            self.metrics.incr(endpoint, 'hedge_skipped')
+            return primary.result()
+        self.metrics.incr(endpoint, 'hedge')
+        pending = {primary, hedged}
+        while True:
+            done, pending = wait_futures(pending,
+                return_when=FIRST_COMPLETED)
+            for fut in done:
+                if fut.exception() is None:
+                    if fut is hedged:
+                        self.metrics.incr(endpoint, 'hedge_win')
+                    # The loser can't be aborted, it is left to finish in
+                    # the background, holding its slot, and its response
+                    # is discarded
+                    return fut.result()
+            if not pending:
+                # Both failed, raise the error from the original request
+                return primary.result()
+
+    def _open_slot(self, url, endpoint):
+        """
+        Performs the request and then gives back the scheduler slot taken
+        for it
+        """
+        try:
+            return self._open_once(url, endpoint)
+        finally:
+            if self.scheduler is not None:
+                self.scheduler.release()
+
+    def _open_once(self, url, endpoint):
+        start = time.monotonic()
         res = self._opener.open(url)
         resp_str = res.read()
+        self.metrics.incr(endpoint, 'request')
+        self.metrics.observe(endpoint, time.monotonic() - start)
 
-        if wait and res.code == 202:
-            time.sleep(1)
-            return self.call(call_type, call_dict, wait)
+        return res.code, resp_str
 
-        return InfoDict.xml_to_info_dict(resp_str, strip_errors=True)
+    def _submit_hedge(self, url, endpoint):
+        """
+        Run _open_once() on a free hedge worker, returns the future or None
+        if all the workers are busy
+        """
+        with self._hedge_lock:
+            if self._hedge_pool is None:
+                self._hedge_pool = ThreadPoolExecutor(
+                    max_workers=self.hedge.workers,
+                    thread_name_prefix='bgg-hedge')
+                self._hedge_free = threading.BoundedSemaphore(
+                    self.hedge.workers)
+
+        if not self._hedge_free.acquire(blocking=False):
+            return None
+        fut = self._hedge_pool.submit(self._open_slot, url, endpoint)
+        fut.add_done_callback(lambda f: self._hedge_free.release())
+
+        return fut
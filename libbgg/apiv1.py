@@ -1,12 +1,14 @@
 
 from libbgg.apibase import BGGBase
+from libbgg.apiv2 import THING_BATCH
 from libbgg.errors import InvalidInputError
+from libbgg.infodict import as_list
 from datetime import date
 
 class BGG(BGGBase):
     def __init__(self, api_token, url_base='http://www.boardgamegeek.com',
-            path_base='xmlapi'):
-        super(BGG, self).__init__(api_token, url_base, path_base)
+            path_base='xmlapi', **kwargs):
+        super(BGG, self).__init__(api_token, url_base, path_base, **kwargs)
 
     def search(self, search_str, exact=False):
         """
@@ -22,11 +24,16 @@ class BGG(BGGBase):
 
     def get_game(self, game_ids=None, comments=False, comments_page=1,
             stats=False, historical=False, historical_start=None,
-            historical_end=None, marketplace=False):
+            historical_end=None, marketplace=False, chunk_size=THING_BATCH,
+            workers=4):
         """
         Gets info on a particular game or games.  game_ids can be either
         an integer id, a string id ("12345"), or an iterable of ids.
 
+        Large lists of ids are split into requests of at most chunk_size
+        ids, which are run concurrently and merged back into a single
+        result with the games in the order of the requests.
+
         game_ids:(str|int|list[int|str])    The id or ids to get info for
         comments:bool       Get user comments.  Can be paginated with
                             comments_page
@@ -37,6 +44,8 @@ class BGG(BGGBase):
         historical_end:datetime.date        The end date for historical stats
         marketplace:bool    Also return the marketplace information for the
                             game
+        chunk_size:int      The maximum number of ids per request
+        workers:int         The maximum number of concurrent requests
         """
         if isinstance(game_ids, (str, int)):
             game_ids = [int(game_ids)]
@@ -69,9 +78,42 @@ class BGG(BGGBase):
         # retrieve marketplace data if specified
         d['marketplace'] = int(marketplace)
 
-        return self.call(
-            'boardgame/{}'.format(','.join([str(gid) for gid in game_ids])), d
-        )
+        chunk_size = int(chunk_size)
+        if chunk_size < 1:
+            raise InvalidInputError('"chunk_size" must be at least 1')
+
+        calls = []
+        for i in range(0, max(len(game_ids), 1), chunk_size):
+            chunk = game_ids[i:i + chunk_size]
+            calls.append((
+                'boardgame/{}'.format(','.join([str(gid) for gid in chunk])),
+                dict(d),
+            ))
+
+        results = self.call_many(calls, workers)
+        if len(results) == 1:
+            return results[0]
+
+        return self._merge_games(results)
+
+    @staticmethod
+    def _merge_games(results):
+        """
+        Merge the results of several boardgame calls into the first one
+        which has any games.  If none of them do, the first result is
+        returned as is.
+        """
+        with_games = [res for res in results if res.get('boardgames')]
+        if not with_games:
+            return results[0]
+
+        games = []
+        for res in with_games:
+            games.extend(as_list(res['boardgames'].get('boardgame')))
+
+        merged = with_games[0]
+        merged['boardgames']['boardgame'] = games
+        return merged
 
     def get_collection(self, username, wait=True, **kwargs):
         """ This will retrieve a user's collection, with optional flags set.
@@ -114,9 +156,36 @@ class BGG(BGGBase):
         if d['count'] > 100:
             raise InvalidInputError('The maximum value for "count" is 100, and '
                 'you requested {}'.format(count))
+        if d['count'] < 1:
+            raise InvalidInputError('The minimum value for "count" is 1, and '
+                'you requested {}'.format(count))
         if username is not None:
             d['username'] = username
-        return self.call('thread/{}'.format(thr_id, d))
+        return self.call('thread/{}'.format(thr_id), d)
+
+    def iter_thread_messages(self, thr_id, start=0, count=100,
+            username=None):
+        """
+        Iterates over all the messages (articles) in a forum/game thread,
+        fetching them a page at a time.
+
+        thr_id:int          The thread id
+        start:int           The article to start from
+        count:int           Number of messages to fetch per page, the
+                            default and max are 100
+        username:str        The username to filter for
+        """
+        while True:
+            res = self.get_thread_messages(thr_id, start, count, username)
+            articles = (res.get('thread') or {}).get('articles') or {}
+            articles = as_list(articles.get('article'))
+
+            for article in articles:
+                yield article
+
+            if len(articles) < count:
+                break
+            start += count
 
     def get_geeklist(self, list_id, comments=False):
         """
@@ -3,6 +3,9 @@ from libbgg.apibase import BGGBase
 from libbgg.errors import InvalidInputError, APICallError
 from datetime import date
 
+# The maximum number of ids BGG allows in a single thing request
+THING_BATCH = 20
+
 class BGG(BGGBase):
     """
     For version 2 of the api, you simply instantiate the object and call
@@ -47,8 +50,8 @@ class BGG(BGGBase):
         'rpgperson', 'boardgamecompany', 'rpgcompany', 'videogamecompany')
 
     def __init__(self, api_token, url_base='http://www.boardgamegeek.com', 
-            path_base='xmlapi2'):
-        super(BGG, self).__init__(api_token, url_base, path_base)
+            path_base='xmlapi2', **kwargs):
+        super(BGG, self).__init__(api_token, url_base, path_base, **kwargs)
         self._last_called = None
         self.api_token = api_token
 
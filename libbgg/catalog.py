@@ -0,0 +1,382 @@
+import mmap
+import os
+import struct
+from collections import namedtuple
+
+from libbgg.errors import InvalidInputError
+from libbgg.infodict import as_list
+
+__all__ = ['CatalogBuilder', 'Catalog', 'CatalogEntry']
+
+"""
+A compact, memory-mappable snapshot of the game catalog.
+
+Holding a few hundred thousand "thing" results as InfoDicts in every worker
+process is very expensive.  The CatalogBuilder here flattens batched thing
+results (retrieved with stats=True) into a single binary file and the
+Catalog reader mmap()s that file read-only, so every process that opens the
+same snapshot shares the same pages via the OS page cache.
+
+Example:
+
+from libbgg.apiv2 import BGG
+from libbgg.catalog import CatalogBuilder, Catalog
+
+bgg = BGG(API_KEY)
+builder = CatalogBuilder()
+builder.add_things(bgg.boardgame((1, 2, 3), stats=True))
+builder.write('catalog.bin')
+
+with Catalog('catalog.bin') as cat:
+    print(cat[1].name)
+    for entry in cat.by_rank(1, 100):
+        print(entry.rank, entry.name)
+
+File layout (all little endian):
+
+header      magic, record count and the offsets of the other sections
+records     fixed width records sorted by id, this doubles as the id index
+heap        utf-8 encoded names referenced by (offset, length) in a record
+rank index  uint32 record positions of the ranked games, sorted by rank
+year index  uint32 record positions of games with a year, sorted by year
+"""
+
+CatalogEntry = namedtuple('CatalogEntry', ('id', 'name', 'year',
+    'min_players', 'max_players', 'playing_time', 'rank', 'average',
+    'weight'))
+
+MAGIC = b'BGGCAT01'
+
+# magic, count, records_off, heap_off, rank_off, rank_count, year_off,
+# year_count
+_HEADER = struct.Struct('<8sIQQQIQI')
+# id, name_off, name_len, year, min_players, max_players, playing_time,
+# rank, average, weight
+_RECORD = struct.Struct('<IIHhHHIIff')
+_POS = struct.Struct('<I')
+
+# Byte offsets of the fields used for searching within a record
+_ID_OFF = 0
+_YEAR_OFF = 10
+_RANK_OFF = 20
+
+_U16_MAX = 0xffff
+_U32_MAX = 0xffffffff
+
+
+def _value(item, *path, default=None):
+    """
+    Walk the path of keys in the item and return the "value" attribute of
+    the final element, or the default if any part of it is missing
+    """
+    cur = item
+    for key in path:
+        if not isinstance(cur, dict) or cur.get(key) is None:
+            return default
+        cur = cur[key]
+    if not isinstance(cur, dict):
+        return default
+    return cur.get('value', default)
+
+
+def _to_int(val, lo, hi):
+    try:
+        val = int(float(val))
+    except (TypeError, ValueError):
+        return 0
+    return max(lo, min(hi, val))
+
+
+def _to_float(val):
+    try:
+        return float(val)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class CatalogBuilder(object):
+    """
+    Accumulates catalog entries and writes them out as a compact snapshot
+    which can be opened with Catalog
+    """
+
+    def __init__(self):
+        self._entries = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, gid, name, year=0, min_players=0, max_players=0,
+            playing_time=0, rank=0, average=0.0, weight=0.0):
+        """
+        Add a single entry to the catalog.  Adding the same id twice will
+        replace the earlier entry.  A rank or year of 0 means unknown.
+
+        gid:int             The BGG id of the thing
+        name:str            The primary name
+        year:int            The year published
+        min_players:int     The minimum player count
+        max_players:int     The maximum player count
+        playing_time:int    The playing time in minutes
+        rank:int            The overall boardgame rank
+        average:float       The average rating
+        weight:float        The average weight
+        """
+        gid = int(gid)
+        if not 0 < gid <= _U32_MAX:
+            raise InvalidInputError('Invalid catalog id: {}'.format(gid))
+        # Truncate on a character boundary so the name always decodes
+        name = (name or '').encode('utf-8')[:_U16_MAX]
+        name = name.decode('utf-8', 'ignore').encode('utf-8')
+        self._entries[gid] = (
+            name,
+            _to_int(year, -0x8000, 0x7fff),
+            _to_int(min_players, 0, _U16_MAX),
+            _to_int(max_players, 0, _U16_MAX),
+            _to_int(playing_time, 0, _U32_MAX),
+            _to_int(rank, 0, _U32_MAX),
+            _to_float(average),
+            _to_float(weight),
+        )
+
+    def add_item(self, item):
+        """
+        Add a single "item" element from a v2 thing result
+
+        item:InfoDict       The item from a thing call
+        """
+        name = None
+        for n in as_list(item.get('name')):
+            if name is None or n.get('type') == 'primary':
+                name = n.get('value')
+
+        rank = 0
+        ranks = item.get('statistics', {}) or {}
+        ranks = (ranks.get('ratings') or {}).get('ranks') or {}
+        for r in as_list(ranks.get('rank')):
+            if r.get('name') == 'boardgame':
+                rank = r.get('value')
+                break
+
+        self.add(
+            item['id'],
+            name,
+            year=_value(item, 'yearpublished'),
+            min_players=_value(item, 'minplayers'),
+            max_players=_value(item, 'maxplayers'),
+            playing_time=_value(item, 'playingtime'),
+            rank=rank,
+            average=_value(item, 'statistics', 'ratings', 'average'),
+            weight=_value(item, 'statistics', 'ratings', 'averageweight'),
+        )
+
+    def add_things(self, result):
+        """
+        Add all the items from a (batched) v2 thing result, e.g. the return
+        value of BGG.boardgame(ids, stats=True)
+
+        result:InfoDict     The thing call result
+        """
+        items = (result.get('items') or {}).get('item')
+        for item in as_list(items):
+            self.add_item(item)
+
+    def write(self, path):
+        """
+        Write the snapshot to the given path.  The file is written to a
+        temporary file and renamed into place so readers which already have
+        the previous snapshot mapped are unaffected.
+
+        path:str            The file path to write the catalog to
+        """
+        ids = sorted(self._entries)
+        heap = bytearray()
+        records = bytearray(_RECORD.size * len(ids))
+        ranked = []
+        dated = []
+
+        for pos, gid in enumerate(ids):
+            name, year, minp, maxp, ptime, rank, avg, weight = \
+                self._entries[gid]
+            _RECORD.pack_into(records, pos * _RECORD.size, gid, len(heap),
+                len(name), year, minp, maxp, ptime, rank, avg, weight)
+            heap += name
+            if rank:
+                ranked.append((rank, pos))
+            if year:
+                dated.append((year, pos))
+
+        rank_idx = b''.join(_POS.pack(pos) for _, pos in sorted(ranked))
+        year_idx = b''.join(_POS.pack(pos) for _, pos in sorted(dated))
+
+        rec_off = _HEADER.size
+        heap_off = rec_off + len(records)
+        rank_off = heap_off + len(heap)
+        year_off = rank_off + len(rank_idx)
+        header = _HEADER.pack(MAGIC, len(ids), rec_off, heap_off, rank_off,
+            len(ranked), year_off, len(dated))
+
+        tmp = '{}.tmp{}'.format(path, os.getpid())
+        with open(tmp, 'wb') as fh:
+            for chunk in (header, records, heap, rank_idx, year_idx):
+                fh.write(chunk)
+            # Make sure the data is on disk before the rename, so a crash
+            # can't leave an empty snapshot in place
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, path)
+
+
+class Catalog(object):
+    """
+    Read-only, memory mapped access to a snapshot written by CatalogBuilder.
+    Lookups and range scans read directly from the mapped pages, only the
+    entries returned are unpacked.
+    """
+
+    def __init__(self, path):
+        """
+        path:str            The path to the catalog snapshot
+        """
+        with open(path, 'rb') as fh:
+            if os.fstat(fh.fileno()).st_size < _HEADER.size:
+                raise InvalidInputError('{} is not a catalog file'.format(
+                    path))
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, self._count, self._rec_off, self._heap_off, self._rank_off,
+            self._rank_count, self._year_off, self._year_count) = \
+            _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self._mm.close()
+            raise InvalidInputError('{} is not a catalog file'.format(path))
+        # The sections follow each other in order, a truncated or partly
+        # copied snapshot will have them running past the end of the file
+        if not (_HEADER.size <= self._rec_off and
+                self._rec_off + self._count * _RECORD.size <= self._heap_off
+                <= self._rank_off and
+                self._rank_off + self._rank_count * _POS.size <=
+                self._year_off and
+                self._year_off + self._year_count * _POS.size <=
+                len(self._mm)):
+            self._mm.close()
+            raise InvalidInputError('{} is truncated or corrupt'.format(
+                path))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self._mm.close()
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        """
+        Iterate all entries in id order
+        """
+        for pos in range(self._count):
+            yield self._entry(pos)
+
+    def __contains__(self, gid):
+        return self._find(int(gid)) is not None
+
+    def __getitem__(self, gid):
+        pos = self._find(int(gid))
+        if pos is None:
+            raise KeyError(gid)
+        return self._entry(pos)
+
+    def get(self, gid, default=None):
+        """
+        Get the entry for the given id, or default if it is not in the
+        catalog
+
+        gid:int             The BGG id to look up
+        """
+        pos = self._find(int(gid))
+        if pos is None:
+            return default
+        return self._entry(pos)
+
+    def ids(self):
+        """
+        Iterate all the ids in the catalog in ascending order
+        """
+        for pos in range(self._count):
+            yield self._field(pos, _ID_OFF, 'I')
+
+    def by_rank(self, lo, hi):
+        """
+        Iterate the ranked entries with lo <= rank <= hi, in rank order
+
+        lo:int              The lowest (best) rank to include
+        hi:int              The highest rank to include
+        """
+        return self._scan(self._rank_off, self._rank_count, _RANK_OFF, 'I',
+            lo, hi)
+
+    def by_year(self, lo, hi):
+        """
+        Iterate the entries published in lo <= year <= hi, in year order
+
+        lo:int              The first year to include
+        hi:int              The last year to include
+        """
+        return self._scan(self._year_off, self._year_count, _YEAR_OFF, 'h',
+            lo, hi)
+
+    def _field(self, pos, off, fmt):
+        return struct.unpack_from('<' + fmt, self._mm,
+            self._rec_off + pos * _RECORD.size + off)[0]
+
+    def _entry(self, pos):
+        (gid, name_off, name_len, year, minp, maxp, ptime, rank, avg,
+            weight) = _RECORD.unpack_from(self._mm,
+            self._rec_off + pos * _RECORD.size)
+        start = self._heap_off + name_off
+        name = self._mm[start:start + name_len].decode('utf-8')
+        return CatalogEntry(gid, name, year, minp, maxp, ptime, rank, avg,
+            weight)
+
+    def _find(self, gid):
+        """
+        Binary search the id sorted records, returning the record position
+        """
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            cur = self._field(mid, _ID_OFF, 'I')
+            if cur == gid:
+                return mid
+            if cur < gid:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def _scan(self, idx_off, idx_count, field_off, fmt, lo, hi):
+        """
+        Binary search a secondary index for the first position >= lo and
+        yield entries until the field value passes hi
+        """
+        def pos_at(i):
+            return _POS.unpack_from(self._mm, idx_off + i * _POS.size)[0]
+
+        left, right = 0, idx_count
+        while left < right:
+            mid = (left + right) // 2
+            if self._field(pos_at(mid), field_off, fmt) < lo:
+                left = mid + 1
+            else:
+                right = mid
+
+        for i in range(left, idx_count):
+            pos = pos_at(i)
+            if self._field(pos, field_off, fmt) > hi:
+                break
+            yield self._entry(pos)
@@ -0,0 +1,373 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from libbgg.apiv2 import BGG, THING_BATCH
+from libbgg.infodict import as_list
+from libbgg.resilience import RetryPolicy
+from libbgg.scheduler import RequestScheduler
+
+__all__ = ['Crawler', 'main']
+
+"""
+A command line crawler for bulk retrieval of things, collections and plays.
+
+bgg-crawl -t $TOKEN -o things.jsonl -s things.state things 1 10000
+bgg-crawl -o plays.jsonl -s plays.state users --plays alice bob
+bgg-crawl -o coll.jsonl -s coll.state guild 1234
+
+Each unit of work (a chunk of thing ids, or a single user) is written as a
+line of JSON to the output file once it has been fully retrieved.  Then
+its thing ids, or its user, are appended to the state file.  Running
+again with the same state file skips everything already done, even with
+a different range or chunk size, so a killed crawl picks up where it
+left off.
+"""
+
+# The page sizes of the plays and guild member lists
+PLAYS_PAGE_SIZE = 100
+GUILD_PAGE_SIZE = 25
+
+
+class CrawlState(object):
+    """
+    The set of finished keys, persisted to an append only file with one
+    key per line
+    """
+
+    def __init__(self, path=None):
+        """
+        path:str            The state file, None to not persist anything
+        """
+        self.path = path
+        self.done = set()
+        self._lock = threading.Lock()
+        self._fh = None
+        if path and os.path.exists(path):
+            with open(path) as fh:
+                self.done = set(line.rstrip('\n') for line in fh
+                    if line.strip())
+
+    def __contains__(self, key):
+        return key in self.done
+
+    def mark(self, keys):
+        """
+        Record the keys as done and sync them to the state file
+
+        keys:list[str]      The keys to add
+        """
+        with self._lock:
+            keys = [key for key in keys if key not in self.done]
+            self.done.update(keys)
+            if not self.path or not keys:
+                return
+            if self._fh is None:
+                self._fh = open(self.path, 'a')
+            self._fh.write(''.join('{}\n'.format(key) for key in keys))
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+
+    def close(self):
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+
+class Crawler(object):
+    """
+    Runs the units of work concurrently, writing the results as JSONL and
+    checkpointing each finished unit
+    """
+
+    def __init__(self, bgg, output, state, concurrency=4, stats_interval=10,
+            stats_out=None):
+        """
+        bgg:libbgg.apiv2.BGG    The api instance to crawl with
+        output:file         A text file object to write the JSONL to
+        state:CrawlState    The checkpoint state
+        concurrency:int     The number of units to work on at once
+        stats_interval:float    Seconds between the progress lines, 0 to
+                            disable them
+        stats_out:file      Where to write the progress lines.  Default:
+                            stderr
+        """
+        self.bgg = bgg
+        self.output = output
+        self.state = state
+        self.concurrency = int(concurrency)
+        self.stats_interval = stats_interval
+        self.stats_out = stats_out if stats_out is not None else sys.stderr
+        self.completed = 0
+        self.failed = 0
+        self.skipped = 0
+        self._total = 0
+        self._start = None
+        self._lock = threading.Lock()
+
+    def run(self, units):
+        """
+        Run the units, a list of (key, done_keys, callable) tuples where
+        the callable returns the JSON serializable result for the unit and
+        done_keys are marked in the state once it is written out.  Units
+        whose done_keys are all in the state already are skipped.  Returns
+        the number of units which failed.
+        """
+        todo = []
+        for key, done_keys, func in units:
+            if all(k in self.state for k in done_keys):
+                self.skipped += 1
+            else:
+                todo.append((key, done_keys, func))
+        self._total = len(todo)
+        self._start = time.monotonic()
+
+        stop = threading.Event()
+        reporter = None
+        if self.stats_interval:
+            reporter = threading.Thread(target=self._report, args=(stop,),
+                name='bgg-crawl-stats', daemon=True)
+            reporter.start()
+
+        pool = ThreadPoolExecutor(max_workers=self.concurrency,
+            thread_name_prefix='bgg-crawl')
+        futures = {}
+        try:
+            for key, done_keys, func in todo:
+                futures[pool.submit(func)] = (key, done_keys)
+            for fut in as_completed(futures):
+                self._finish(*futures.pop(fut), fut)
+            pool.shutdown()
+        except BaseException:
+            # Interrupted, drop the queued units and wait for the running
+            # ones so their results are still written and checkpointed
+            pool.shutdown(wait=True, cancel_futures=True)
+            for fut, (key, done_keys) in futures.items():
+                if fut.done() and not fut.cancelled():
+                    self._finish(key, done_keys, fut)
+            raise
+        finally:
+            stop.set()
+            if reporter is not None:
+                reporter.join()
+            self.report()
+
+        return self.failed
+
+    def _finish(self, key, done_keys, fut):
+        try:
+            result = fut.result()
+        except Exception as e:
+            with self._lock:
+                self.failed += 1
+            print('{}: failed: {}'.format(key, e), file=self.stats_out)
+            return
+
+        self.output.write(json.dumps({'unit': key, 'result': result}))
+        self.output.write('\n')
+        self.output.flush()
+        self.state.mark(done_keys)
+        with self._lock:
+            self.completed += 1
+
+    def stats(self):
+        """
+        Returns a dict of the crawl progress and the request counters summed
+        over all the endpoints
+        """
+        counters = {}
+        for ep_stats in self.bgg.metrics.snapshot().values():
+            for name, val in ep_stats.items():
+                if name not in ('p50', 'p90', 'p99'):
+                    counters[name] = counters.get(name, 0) + val
+        elapsed = time.monotonic() - self._start if self._start else 0
+        with self._lock:
+            done = self.completed
+
+        return {
+            'done': done,
+            'failed': self.failed,
+            'skipped': self.skipped,
+            'total': self._total,
+            'elapsed': elapsed,
+            'units_per_sec': done / elapsed if elapsed else 0.0,
+            'requests': counters.get('request', 0),
+            'requests_per_sec': counters.get('request', 0) / elapsed
+                if elapsed else 0.0,
+            'errors': counters.get('error', 0),
+            'retries': counters.get('retry', 0),
+            'waits_202': counters.get('wait_202', 0),
+        }
+
+    def report(self):
+        print('{done}/{total} units ({failed} failed, {skipped} skipped) '
+            '{units_per_sec:.2f} units/s, {requests} requests '
+            '{requests_per_sec:.2f} req/s, {errors} errors, {retries} '
+            'retries, {waits_202} 202 waits'.format(**self.stats()),
+            file=self.stats_out)
+
+    def _report(self, stop):
+        while not stop.wait(self.stats_interval):
+            self.report()
+
+
+def thing_units(bgg, start, end, ttype='boardgame', stats=False,
+        chunk=THING_BATCH, done=()):
+    """
+    Generates the units for the thing ids from start to end, inclusive.
+    Progress is tracked per id, so ids in done are left out and the
+    remaining ids are chunked, whatever the chunk size or range of an
+    earlier run was.
+
+    done:container      The state keys which are already done
+    """
+    ids = [gid for gid in range(start, end + 1)
+        if _thing_key(ttype, gid) not in done]
+    for i in range(0, len(ids), chunk):
+        chunk_ids = ids[i:i + chunk]
+        key = '{}:{}-{}'.format(ttype, chunk_ids[0], chunk_ids[-1])
+        # Call _things directly with the type, bgg.boardgame() goes through
+        # __getattr__ which isn't safe to use from several threads
+        yield key, [_thing_key(ttype, gid) for gid in chunk_ids], \
+            (lambda ids=chunk_ids: bgg._things(ids, ttype=ttype,
+            stats=stats))
+
+
+def _thing_key(ttype, gid):
+    return '{}:{}'.format(ttype, gid)
+
+
+def user_units(bgg, usernames, plays=False):
+    """
+    Generates a collection, or a plays, unit for each of the usernames
+    """
+    for username in usernames:
+        if plays:
+            key = 'plays:{}'.format(username)
+            yield key, [key], (lambda u=username: _all_plays(bgg, u))
+        else:
+            key = 'collection:{}'.format(username)
+            yield key, [key], (lambda u=username: bgg.get_collection(u))
+
+
+def _all_plays(bgg, username):
+    pages = []
+    page = 1
+    while True:
+        res = bgg.get_plays(username=username, page=page)
+        pages.append(res)
+        plays = as_list((res.get('plays') or {}).get('play'))
+        if len(plays) < PLAYS_PAGE_SIZE:
+            return pages
+        page += 1
+
+
+def guild_members(bgg, gid):
+    """
+    Returns the usernames of all the members of the guild
+    """
+    names = []
+    page = 1
+    while True:
+        res = bgg.get_guilds(gid, members=True, page=page)
+        members = (res.get('guild') or {}).get('members') or {}
+        members = as_list(members.get('member'))
+        names.extend(m['name'] for m in members)
+        if len(members) < GUILD_PAGE_SIZE:
+            return names
+        page += 1
+
+
+def _get_args(argv):
+    p = argparse.ArgumentParser(prog='bgg-crawl',
+        description='Crawl Board Game Geek things, collections and plays '
+        'to a JSONL file')
+    p.add_argument('-t', '--token', default=os.environ.get('BGG_API_TOKEN'),
+        help='The BGG API token.  Default: $BGG_API_TOKEN')
+    p.add_argument('-o', '--output', default='-',
+        help='The JSONL file to append results to.  Default: stdout')
+    p.add_argument('-s', '--state', default=None,
+        help='The checkpoint state file.  Without one, nothing is '
+        'resumable')
+    p.add_argument('-c', '--concurrency', type=int, default=4,
+        help='The number of concurrent requests.  Default: %(default)s')
+    p.add_argument('-r', '--rate', type=float, default=2.0,
+        help='The maximum requests per second.  Default: %(default)s')
+    p.add_argument('--retries', type=int, default=3,
+        help='Retries for failed requests.  Default: %(default)s')
+    p.add_argument('-i', '--stats-interval', type=float, default=10,
+        help='Seconds between progress lines, 0 to disable.  '
+        'Default: %(default)s')
+    sub = p.add_subparsers(dest='command', required=True)
+
+    things = sub.add_parser('things', help='Crawl a range of thing ids')
+    things.add_argument('start', type=int)
+    things.add_argument('end', type=int)
+    things.add_argument('--type', default='boardgame', choices=BGG.things)
+    things.add_argument('--stats', action='store_true',
+        help='Include the ratings and ranks')
+    things.add_argument('--chunk', type=int, default=THING_BATCH,
+        help='Ids per request.  Default: %(default)s')
+
+    users = sub.add_parser('users', help='Crawl a list of users')
+    users.add_argument('usernames', nargs='*')
+    users.add_argument('-f', '--file',
+        help='Read the usernames, one per line, from this file')
+    users.add_argument('--plays', action='store_true',
+        help='Crawl plays instead of collections')
+
+    guild = sub.add_parser('guild', help='Crawl the members of a guild')
+    guild.add_argument('gid', type=int)
+    guild.add_argument('--plays', action='store_true',
+        help='Crawl plays instead of collections')
+
+    args = p.parse_args(argv)
+    if not args.token:
+        p.error('An API token is required, use --token or $BGG_API_TOKEN')
+    if args.command == 'things' and not 0 < args.chunk <= THING_BATCH:
+        p.error('--chunk must be between 1 and {}'.format(THING_BATCH))
+
+    return args
+
+
+def main(argv=None):
+    args = _get_args(argv)
+    bgg = BGG(args.token, retry=RetryPolicy(retries=args.retries),
+        scheduler=RequestScheduler(rate=args.rate,
+        max_inflight=args.concurrency, default_class='batch',
+        endpoint_classes={}))
+
+    state = CrawlState(args.state)
+    if args.command == 'things':
+        units = thing_units(bgg, args.start, args.end, args.type, args.stats,
+            args.chunk, state)
+    else:
+        if args.command == 'guild':
+            usernames = guild_members(bgg, args.gid)
+        else:
+            usernames = list(args.usernames)
+            if args.file:
+                with open(args.file) as fh:
+                    usernames.extend(l.strip() for l in fh if l.strip())
+        units = user_units(bgg, usernames, args.plays)
+
+    output = sys.stdout if args.output == '-' else open(args.output, 'a')
+    try:
+        crawler = Crawler(bgg, output, state, args.concurrency,
+            args.stats_interval)
+        failed = crawler.run(units)
+    finally:
+        state.close()
+        if output is not sys.stdout:
+            output.close()
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,3 +4,12 @@ class InvalidInputError(Exception):
 
 class APICallError(Exception):
     pass
+
+class CircuitOpenError(APICallError):
+    pass
+
+class SchedulerFullError(APICallError):
+    pass
+
+class DeadlineExceededError(APICallError):
+    pass
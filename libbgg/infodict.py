@@ -2,7 +2,7 @@
 import xml.etree.ElementTree as ET
 import re
 
-__all__ = ['InfoDict']
+__all__ = ['InfoDict', 'as_list']
 
 """
 This is a simple library that will convert a valid XML document to 
@@ -137,3 +137,16 @@ class InfoDict(dict):
             return InfoDict._get_root('\n'.join(lines))
 
         return root
+
+
+def as_list(val):
+    """
+    An InfoDict holds a single InfoDict or a list of them, depending on how
+    many elements with the same tag were at that level.  This always returns
+    a list, which is empty for None.
+    """
+    if val is None:
+        return []
+    if isinstance(val, list):
+        return val
+    return [val]
@@ -0,0 +1,281 @@
+import math
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+
+from libbgg.errors import CircuitOpenError, InvalidInputError
+
+__all__ = ['RetryPolicy', 'HedgePolicy', 'CircuitBreaker', 'Metrics']
+
+"""
+The pieces used by BGGBase to make calls to BGG more resilient.  Each of
+these is optional and is passed to the api constructor:
+
+from libbgg.apiv2 import BGG
+from libbgg.resilience import RetryPolicy, HedgePolicy, CircuitBreaker
+
+bgg = BGG(API_KEY, retry=RetryPolicy(retries=4), hedge=HedgePolicy(95),
+    breaker=CircuitBreaker())
+bgg.boardgame(13)
+print(bgg.metrics.snapshot())
+
+Endpoints are the first portion of the call path, e.g. "thing" or
+"boardgame", and breakers, hedging thresholds and metrics are all tracked
+per endpoint.
+"""
+
+
+class RetryPolicy(object):
+    """
+    Retry failed calls with exponential backoff
+    """
+
+    def __init__(self, retries=3, backoff=1.0, max_backoff=60.0,
+            statuses=(429, 500, 502, 503, 504), network_errors=True):
+        """
+        retries:int         The maximum number of retries after the first
+                            attempt
+        backoff:float       The base delay in seconds, doubled on each retry
+        max_backoff:float   The maximum delay in seconds between attempts.
+                            If BGG asks for a longer Retry-After, the call
+                            fails rather than retrying early
+        statuses:tuple      The HTTP status codes which will be retried
+        network_errors:bool Also retry on connection errors and timeouts
+        """
+        self.retries = int(retries)
+        self.backoff = float(backoff)
+        self.max_backoff = float(max_backoff)
+        self.statuses = frozenset(statuses)
+        self.network_errors = network_errors
+
+    def should_retry(self, attempt, status=None):
+        """
+        Returns True if the failed attempt (0 based) should be retried
+
+        attempt:int         The attempt which just failed
+        status:int          The HTTP status, None for a network error
+        """
+        if attempt >= self.retries:
+            return False
+        if status is None:
+            return self.network_errors
+        return status in self.statuses
+
+    def delay(self, attempt, retry_after=None):
+        """
+        Returns the number of seconds to wait before the next attempt.  If
+        BGG sent a Retry-After header, it is honored, otherwise this is
+        exponential backoff with jitter.  Returns None if the Retry-After
+        is longer than max_backoff, and the call shouldn't be retried.
+
+        attempt:int         The attempt which just failed
+        retry_after:str     The Retry-After header value, if any
+        """
+        wait = self.parse_retry_after(retry_after)
+        if wait is not None:
+            wait = max(wait, 0.0)
+            return wait if wait <= self.max_backoff else None
+
+        wait = self.backoff * (2 ** attempt)
+        return min(random.uniform(wait / 2, wait), self.max_backoff)
+
+    @staticmethod
+    def parse_retry_after(value):
+        """
+        Parse a Retry-After header, which can either be a number of seconds
+        or an HTTP date.  Returns the seconds to wait or None.
+        """
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            pass
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return (when - datetime.now(timezone.utc)).total_seconds()
+
+
+class HedgePolicy(object):
+    """
+    Send a duplicate request when the first has taken longer than the
+    given latency percentile for the endpoint, and use whichever response
+    comes back first.  All the BGG api calls are reads, so this is safe
+    for any of them, but it can be limited to a set of endpoints.
+    """
+
+    def __init__(self, percentile=95, min_samples=20, min_delay=0.05,
+            endpoints=None, workers=8):
+        """
+        percentile:float    The latency percentile after which to hedge
+        min_samples:int     The number of latencies which need to be
+                            observed for the endpoint before hedging
+        min_delay:float     The minimum number of seconds to wait before
+                            hedging
+        endpoints:list      If set, only hedge calls to these endpoints
+        workers:int         The number of threads for hedged requests.  A
+                            call is only hedged while a thread is free, set
+                            this to twice the number of concurrent callers
+                            to hedge every slow call
+        """
+        self.percentile = float(percentile)
+        self.min_samples = int(min_samples)
+        self.min_delay = float(min_delay)
+        self.endpoints = frozenset(endpoints) if endpoints else None
+        if int(workers) < 2:
+            raise InvalidInputError('A hedge needs at least 2 workers')
+        self.workers = int(workers)
+
+    def delay(self, metrics, endpoint):
+        """
+        Returns the number of seconds after which to send the hedge, or
+        None if the call shouldn't be hedged
+        """
+        if self.endpoints is not None and endpoint not in self.endpoints:
+            return None
+        if metrics.samples(endpoint) < self.min_samples:
+            return None
+        return max(self.min_delay, metrics.percentile(endpoint,
+            self.percentile))
+
+
+class CircuitBreaker(object):
+    """
+    A per endpoint circuit breaker.  After failure_threshold consecutive
+    failures the circuit for the endpoint opens and calls fail fast with
+    a CircuitOpenError.  Once reset_timeout seconds have passed, a single
+    trial call is let through, closing the circuit if it succeeds.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        """
+        failure_threshold:int   Consecutive failures which open the circuit
+        reset_timeout:float     Seconds to stay open before a trial call
+        """
+        self.failure_threshold = int(failure_threshold)
+        self.reset_timeout = float(reset_timeout)
+        self._lock = threading.Lock()
+        self._failures = defaultdict(int)
+        self._opened = {}
+        self._trial = set()
+
+    def state(self, endpoint):
+        with self._lock:
+            return self._state(endpoint)
+
+    def _state(self, endpoint):
+        if endpoint in self._trial:
+            return self.HALF_OPEN
+        if endpoint not in self._opened:
+            return self.CLOSED
+        if time.monotonic() - self._opened[endpoint] >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def before(self, endpoint):
+        """
+        Called before each request.  Raises CircuitOpenError if the call
+        should fail fast.
+        """
+        with self._lock:
+            state = self._state(endpoint)
+            if state == self.CLOSED:
+                return
+            if state == self.HALF_OPEN and endpoint not in self._trial:
+                self._trial.add(endpoint)
+                return
+            raise CircuitOpenError('The circuit for "{}" is open after {} '
+                'consecutive failures'.format(endpoint,
+                self._failures[endpoint]))
+
+    def success(self, endpoint):
+        with self._lock:
+            self._failures.pop(endpoint, None)
+            self._opened.pop(endpoint, None)
+            self._trial.discard(endpoint)
+
+    def cancel(self, endpoint):
+        """
+        Called when a request allowed by before() was never sent, so a
+        trial call slot is freed up again
+        """
+        with self._lock:
+            self._trial.discard(endpoint)
+
+    def failure(self, endpoint):
+        with self._lock:
+            self._failures[endpoint] += 1
+            if (endpoint in self._trial or
+                    self._failures[endpoint] >= self.failure_threshold):
+                self._opened[endpoint] = time.monotonic()
+            self._trial.discard(endpoint)
+
+
+class Metrics(object):
+    """
+    Thread safe per endpoint counters and a window of recent latencies
+    """
+
+    def __init__(self, window=1000):
+        """
+        window:int          The number of latencies to keep per endpoint
+        """
+        self.window = int(window)
+        self._lock = threading.Lock()
+        self._counters = defaultdict(lambda: defaultdict(int))
+        self._latencies = defaultdict(lambda: deque(maxlen=self.window))
+
+    def incr(self, endpoint, name, count=1):
+        with self._lock:
+            self._counters[endpoint][name] += count
+
+    def observe(self, endpoint, latency):
+        """
+        Record the latency, in seconds, of a completed request
+        """
+        with self._lock:
+            self._latencies[endpoint].append(latency)
+
+    def samples(self, endpoint):
+        with self._lock:
+            return len(self._latencies.get(endpoint, ()))
+
+    def percentile(self, endpoint, pct):
+        """
+        Returns the pct percentile latency for the endpoint, or None if no
+        latencies have been observed
+        """
+        with self._lock:
+            lat = sorted(self._latencies.get(endpoint, ()))
+        if not lat:
+            return None
+        # Nearest rank percentile
+        idx = max(0, min(len(lat), math.ceil(pct / 100.0 * len(lat))) - 1)
+        return lat[idx]
+
+    def counter(self, endpoint, name):
+        with self._lock:
+            return self._counters.get(endpoint, {}).get(name, 0)
+
+    def snapshot(self):
+        """
+        Returns a dict of endpoint -> counters plus p50, p90 and p99
+        latencies, suitable for logging or exporting
+        """
+        with self._lock:
+            endpoints = set(self._counters) | set(self._latencies)
+            ret = {ep: dict(self._counters.get(ep, {})) for ep in endpoints}
+        for ep in endpoints:
+            for pct in (50, 90, 99):
+                ret[ep]['p{}'.format(pct)] = self.percentile(ep, pct)
+        return ret
@@ -0,0 +1,360 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from libbgg.errors import (
+    APICallError,
+    DeadlineExceededError,
+    InvalidInputError,
+    SchedulerFullError,
+)
+
+__all__ = ['RequestScheduler', 'PriorityClass']
+
+"""
+A priority aware scheduler which shares a single BGG request budget between
+interactive and batch traffic.
+
+Every request waits in the queue for its priority class until the
+scheduler grants it a slot.  Slots are handed out no faster than the
+configured rate, and when several classes are waiting, each one gets a
+share of the slots proportional to its weight.  When only one class has
+requests waiting, it gets all the capacity, so batch jobs soak up whatever
+the interactive traffic leaves over.  Queues are bounded and requests
+which are still queued when their deadline passes are cancelled.
+
+Example:
+
+from libbgg.apiv2 import BGG
+from libbgg.scheduler import RequestScheduler
+
+bgg = BGG(API_KEY, scheduler=RequestScheduler(rate=2))
+# search and user calls are interactive, everything else is batch
+bgg.search('bruges')
+
+# The class can be overridden for all calls made in a block
+with bgg.scheduler.priority('interactive'):
+    bgg.boardgame(13)
+"""
+
+
+class PriorityClass(object):
+    """
+    The settings for a single priority class
+    """
+
+    def __init__(self, weight=1, max_queue=1000, deadline=None):
+        """
+        weight:float        The relative share of the request budget this
+                            class gets when other classes are also waiting
+        max_queue:int       The maximum number of queued requests, after
+                            which SchedulerFullError is raised
+        deadline:float      The default number of seconds a request may
+                            wait in the queue.  None means forever
+        """
+        if weight <= 0:
+            raise InvalidInputError('Priority class weight must be > 0')
+        self.weight = float(weight)
+        self.max_queue = int(max_queue)
+        self.deadline = deadline
+
+
+DEFAULT_CLASSES = {
+    'interactive': PriorityClass(weight=8, max_queue=100, deadline=30),
+    'batch': PriorityClass(weight=1, max_queue=10000),
+}
+
+DEFAULT_ENDPOINT_CLASSES = {
+    'search': 'interactive',
+    'user': 'interactive',
+}
+
+
+class _Ticket(object):
+    __slots__ = ('cls', 'deadline', 'event', 'granted', 'error')
+
+    def __init__(self, cls, deadline):
+        self.cls = cls
+        self.deadline = deadline
+        self.event = threading.Event()
+        self.granted = False
+        self.error = None
+
+
+class RequestScheduler(object):
+    """
+    Grants request slots to callers by priority class, within a shared
+    rate limit
+    """
+
+    def __init__(self, rate=2.0, burst=1, max_inflight=None, classes=None,
+            endpoint_classes=None, default_class='batch'):
+        """
+        rate:float          The maximum number of requests per second,
+                            None for no limit
+        burst:int           The number of requests which can be made back to
+                            back after an idle period
+        max_inflight:int    The maximum number of concurrent requests, None
+                            for no limit
+        classes:dict        A mapping of class name -> PriorityClass.
+                            Default: DEFAULT_CLASSES
+        endpoint_classes:dict   A mapping of endpoint -> class name.
+                            Default: DEFAULT_ENDPOINT_CLASSES
+        default_class:str   The class for endpoints which aren't mapped
+        """
+        self.rate = float(rate) if rate else None
+        self.burst = max(1, int(burst))
+        self.max_inflight = max_inflight
+        self.classes = dict(classes or DEFAULT_CLASSES)
+        self.endpoint_classes = dict(endpoint_classes if endpoint_classes
+            is not None else DEFAULT_ENDPOINT_CLASSES)
+        self.default_class = default_class
+        for name in [default_class] + list(self.endpoint_classes.values()):
+            if name not in self.classes:
+                raise InvalidInputError('Unknown priority class: {}'.format(
+                    name))
+
+        self._cond = threading.Condition()
+        self._local = threading.local()
+        self._queues = {name: deque() for name in self.classes}
+        # The stride scheduling pass value of each class, the class with
+        # the lowest pass goes next and its pass advances by 1 / weight
+        self._pass = {name: 0.0 for name in self.classes}
+        self._vtime = 0.0
+        self._tokens = float(self.burst)
+        self._refilled = time.monotonic()
+        self._inflight = 0
+        self._closed = False
+        self._thread = None
+        self._stats = {name: {'granted': 0, 'expired': 0, 'rejected': 0}
+            for name in self.classes}
+
+    def classify(self, endpoint=None):
+        """
+        Returns the class name for a call to the endpoint, honoring any
+        priority() block the current thread is in
+        """
+        override = getattr(self._local, 'priority', None)
+        if override is not None:
+            return override
+        return self.endpoint_classes.get(endpoint, self.default_class)
+
+    @contextmanager
+    def priority(self, name):
+        """
+        Run all the calls made by this thread within the block in the given
+        priority class
+        """
+        if name not in self.classes:
+            raise InvalidInputError('Unknown priority class: {}'.format(name))
+        prev = getattr(self._local, 'priority', None)
+        self._local.priority = name
+        try:
+            yield
+        finally:
+            self._local.priority = prev
+
+    def current_priority(self):
+        """
+        Returns the class set by the priority() block the current thread is
+        in, or None.  Pass this on when handing calls to other threads.
+        """
+        return getattr(self._local, 'priority', None)
+
+    def acquire(self, endpoint=None, priority=None, deadline=None):
+        """
+        Block until the scheduler grants a request slot.  Every successful
+        acquire() must be followed by a release() once the request is done.
+
+        endpoint:str        The endpoint, used to pick the class
+        priority:str        Explicitly set the class
+        deadline:float      The number of seconds to wait at most.
+                            Defaults to the class deadline
+
+        Raises SchedulerFullError if the class queue is full, and
+        DeadlineExceededError if the deadline passes before a slot is
+        granted.
+        """
+        cls = priority or self.classify(endpoint)
+        if cls not in self.classes:
+            raise InvalidInputError('Unknown priority class: {}'.format(cls))
+        if deadline is None:
+            deadline = self.classes[cls].deadline
+        ticket = self._enqueue(cls, None if deadline is None
+            else time.monotonic() + deadline)
+
+        ticket.event.wait(deadline)
+        with self._cond:
+            if not ticket.granted and ticket.error is None:
+                # Timed out waiting, the dispatcher will drop the ticket
+                ticket.error = DeadlineExceededError('Request was not '
+                    'scheduled within {}s'.format(deadline))
+                self._stats[cls]['expired'] += 1
+                self._cond.notify_all()
+        if ticket.error is not None:
+            raise ticket.error
+
+    def try_acquire(self, endpoint=None, priority=None):
+        """
+        Take a request slot only if one is free right now and nothing is
+        queued for it.  Returns True if a slot was taken, which must then be
+        given back with release().  This is used for optional extra
+        requests, such as hedges.
+        """
+        cls = priority or self.classify(endpoint)
+        if cls not in self.classes:
+            raise InvalidInputError('Unknown priority class: {}'.format(cls))
+        with self._cond:
+            self._refill(time.monotonic())
+            if self._closed or self._tokens < 1 or \
+                    any(self._queues.values()):
+                return False
+            if self.max_inflight is not None and \
+                    self._inflight >= self.max_inflight:
+                return False
+            self._tokens -= 1
+            self._inflight += 1
+            self._stats[cls]['granted'] += 1
+
+        return True
+
+    def release(self):
+        """
+        Give back a slot taken by acquire() or try_acquire()
+        """
+        with self._cond:
+            self._inflight -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, endpoint=None, priority=None, deadline=None):
+        """
+        Block until the scheduler grants a request slot, and hold it for
+        the duration of the block.  See acquire() for the arguments.
+        """
+        self.acquire(endpoint, priority, deadline)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def run(self, func, *args, endpoint=None, priority=None, deadline=None,
+            **kwargs):
+        """
+        Call func(*args, **kwargs) once a slot is granted and return the
+        result.  See slot() for the other arguments.
+        """
+        with self.slot(endpoint, priority, deadline):
+            return func(*args, **kwargs)
+
+    def stats(self):
+        """
+        Returns a dict of class name -> the number of queued, granted,
+        expired and rejected requests
+        """
+        with self._cond:
+            ret = {}
+            for name, stats in self._stats.items():
+                ret[name] = dict(stats, queued=sum(1 for t in
+                    self._queues[name] if t.error is None))
+            ret['inflight'] = self._inflight
+            return ret
+
+    def close(self):
+        """
+        Stop the scheduler, all the queued requests fail
+        """
+        with self._cond:
+            self._closed = True
+            for queue in self._queues.values():
+                while queue:
+                    ticket = queue.popleft()
+                    if ticket.error is None:
+                        ticket.error = APICallError('The scheduler has '
+                            'been closed')
+                    ticket.event.set()
+            self._cond.notify_all()
+
+    def _enqueue(self, cls, deadline):
+        ticket = _Ticket(cls, deadline)
+        with self._cond:
+            if self._closed:
+                raise APICallError('The scheduler has been closed')
+            queue = self._queues[cls]
+            if len(queue) >= self.classes[cls].max_queue:
+                self._purge(cls, time.monotonic())
+                if len(queue) >= self.classes[cls].max_queue:
+                    self._stats[cls]['rejected'] += 1
+                    raise SchedulerFullError('The "{}" queue is full with {} '
+                        'requests'.format(cls, len(queue)))
+            if not queue:
+                # Don't let a class bank credit while it was idle
+                self._pass[cls] = max(self._pass[cls], self._vtime)
+            queue.append(ticket)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._dispatch,
+                    name='bgg-scheduler', daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+        return ticket
+
+    def _purge(self, cls, now):
+        """
+        Drop the cancelled and expired tickets from the queue for cls
+        """
+        queue = self._queues[cls]
+        kept = []
+        for ticket in queue:
+            if ticket.error is None and ticket.deadline is not None and \
+                    ticket.deadline <= now:
+                ticket.error = DeadlineExceededError('Request deadline '
+                    'passed while queued')
+                self._stats[cls]['expired'] += 1
+                ticket.event.set()
+            if ticket.error is None:
+                kept.append(ticket)
+        queue.clear()
+        queue.extend(kept)
+
+    def _refill(self, now):
+        if self.rate is None:
+            self._tokens = float(self.burst)
+            return
+        self._tokens = min(float(self.burst),
+            self._tokens + (now - self._refilled) * self.rate)
+        self._refilled = now
+
+    def _dispatch(self):
+        with self._cond:
+            while not self._closed:
+                now = time.monotonic()
+                self._refill(now)
+                for cls, queue in self._queues.items():
+                    if queue and (queue[0].error is not None or
+                            (queue[0].deadline is not None and
+                            queue[0].deadline <= now)):
+                        self._purge(cls, now)
+
+                active = [cls for cls, queue in self._queues.items() if queue]
+                if not active:
+                    self._cond.wait()
+                    continue
+                if self.max_inflight is not None and \
+                        self._inflight >= self.max_inflight:
+                    self._cond.wait()
+                    continue
+                if self._tokens < 1:
+                    self._cond.wait((1 - self._tokens) / self.rate)
+                    continue
+
+                cls = min(active, key=lambda c: self._pass[c])
+                ticket = self._queues[cls].popleft()
+                self._vtime = self._pass[cls]
+                self._pass[cls] += 1.0 / self.classes[cls].weight
+                self._tokens -= 1
+                self._inflight += 1
+                self._stats[cls]['granted'] += 1
+                ticket.granted = True
+                ticket.event.set()
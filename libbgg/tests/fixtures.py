@@ -1 +1,3 @@
 bgg_boardgame_response = b'<boardgames termsofuse="https://boardgamegeek.com/xmlapi/termsofuse">\n\t\t\t<boardgame objectid="1">\n   <yearpublished>1986</yearpublished>\n   <minplayers>3</minplayers>\n   <maxplayers>5</maxplayers>\n   <playingtime>240</playingtime>\n   <minplaytime>240</minplaytime>\n   <maxplaytime>240</maxplaytime>\n   <age>14</age>\n\n   \t   <name primary="true" sortindex="5">Die Macher</name>\n   \t   <name  sortindex="1">\xe5\xbe\xb7\xe5\x9b\xbd\xe5\xa4\xa7\xe9\x80\x89</name>\n   \t   <name  sortindex="1">\xeb\x94\x94 \xeb\xa7\x88\xed\x97\x88</name>\n   \n   <description>Die Macher is a game about seven sequential political races in different regions of Germany. Players are in charge of national political parties, and must manage limited resources to help their party to victory. The winning party will have the most victory points after all the regional elections. There are four different ways of scoring victory points. First, each regional election can supply one to eighty victory points, depending on the size of the region and how well your party does in it. Second, if a party wins a regional election and has some media influence in the region, then the party will receive some media-control victory points. Third, each party has a national party membership which will grow as the game progresses and this will supply a fair number of victory points. Lastly, parties score some victory points if their party platform matches the national opinions at the end of the game.&lt;br/&gt;&lt;br/&gt;The 1986 edition featured four parties from the old West Germany and supported 3-4 players. The 1997 edition supports up to five players in the re-united Germany and updated several features of the rules as well.  The 2006 edition also supports up to five players and adds a shorter five-round variant and additional rules updates by the original designer.&lt;br/&gt;&lt;br/&gt;</description>\n\n   \t   <thumbnail>https://cf.geekdo-images.com/rpwCZAjYLD940NWwP3SRoA__small/img/YT6svCVsWqLrDitcMEtyazVktbQ=/fit-in/200x150/filters:strip_icc()/pic4718279.jpg</thumbnail>\n\t   <image>https://cf.geekdo-images.com/rpwCZAjYLD940NWwP3SRoA__original/img/yR0aoBVKNrAmmCuBeSzQnMflLYg=/0x0/filters:format(jpeg)/pic4718279.jpg</image>\n   \n   \t   \t\t   <boardgamepublisher objectid="133">Hans im Gl\xc3\xbcck</boardgamepublisher>\n      \t   \t\t   <boardgamepublisher objectid="2">Moskito Spiele</boardgamepublisher>\n      \t      \t      \t   \t\t   <boardgamepodcastepisode objectid="448728">[T\xe2\x80\x99as jou\xc3\xa9 \xc3\xa0 quoi au Week-End Proxi-Jeux ?] \xc3\x89dition 2022</boardgamepodcastepisode>\n      \t   \t\t   <boardgamepodcastepisode objectid="543360">#30 live from SaltCON, Con-Maxing</boardgamepodcastepisode>\n      \t   \t\t   <boardgamehonor objectid="107544">1997 Meeples Choice Award Nominee</boardgamehonor>\n      \t   \t\t   <boardgamehonor objectid="19702">1998 Essener Feder Best Written Rules Winner</boardgamehonor>\n      \t   \t\t   <boardgamehonor objectid="8673">1998 Spiel des Jahres Recommended</boardgamehonor>\n      \t   \t\t   <boardgamehonor objectid="18935">2008 JoTa Best Monster Board Game Nominee</boardgamehonor>\n      \t   \t\t   <boardgamehonor objectid="18936">2008 JoTa Best Monster Board Game Winner</boardgamehonor>\n      \t   \t\t   <boardgamemechanic objectid="2916">Alliances</boardgamemechanic>\n      \t   \t\t   <boardgamemechanic objectid="2080">Area Majority / Influence</boardgamemechanic>\n      \t   \t\t   <boardgamemechanic objectid="2012">Auction / Bidding</boardgamemechanic>\n      \t   \t\t   <boardgamepodcastepisode objectid="177525">BGA Episode 100 - Top 100 Games of All Time</boardgamepodcastepisode>\n      \t   \t\t   <boardgamepodcastepisode objectid="86194">BGTG 112 - Five-Player Games (with Dave O&#039;Connor)</boardgamepodcastepisode>\n      \t   \t\t   <boardgamepodcastepisode objectid="101144">BGTG 136 - 100 Great Games, part 3 (with Stephen Glenn and Mark Jackson)</boardgamepodcastepisode>\n      \t   \t\t   <boardgamepodcastepisode objectid="3361">BGWS 024 \xe2\x80\x93 Die Macher</boardgamepodcastepisode>\n      \t      \t   \t\t   <boardgameartist objectid="928">Bernd Brunnhofer</boardgameartist>\n      \t   \t\t   <boardgameversion objectid="456543">Chinese edition</boardgameversion>\n      \t      \t      \t   \t\t   <boardgamefamily objectid="10643">Country: Germany</boardgamefamily>\n      \t   \t\t   <boardgamemechanic objectid="2072">Dice Rolling</boardgamemechanic>\n      \t   \t\t   <boardgamefamily objectid="81575">Digital Implementations: VASSAL</boardgamefamily>\n      \t      \t      \t      \t   \t\t   <boardgamecategory objectid="1021">Economic</boardgamecategory>\n      \t   \t\t   <boardgamepublisher objectid="24883">Ediciones MasQueOca</boardgamepublisher>\n      \t      \t      \t      \t      \t      \t      \t   \t\t   <boardgamepodcastepisode objectid="350891">Ep 24- Top 3 Games From The 20th Century</boardgamepodcastepisode>\n      \t   \t\t   <boardgamepodcastepisode objectid="219134">Episode 135 The Good, the Board, and the Old : Games released pre-1990</boardgamepodcastepisode>\n      \t   \t\t   <boardgamepodcastepisode objectid="299861">Episode 23 \xe2\x80\x93 Jaws, Everdell, Kickstarters, News, and more</boardgamepodcastepisode>\n      \t   \t\t   <boardgamepodcastepisode objectid="370133">Episode 28 - Negotiation Games</boardgamepodcastepisode>\n      \t   \t\t   <boardgamepodcastepisode objectid="175510">Episode 31 - Top 50, Picks 40-31</boardgamepodcastepisode>\n      \t   \t\t   <boardgamepodcastepisode objectid="104630">Episodio 11 \xe2\x80\x93 Especial verano 2013: Juegos no jugados</boardgamepodcastepisode>\n      \t   \t\t   <boardgamepodcastepisode objectid="61407">Episodio 3 \xe2\x80\x93 Hom\xc3\xadnidos 2011 y entrevista a Pol Cors</boardgamepodcastepisode>\n      \t      \t      \t      \t      \t      \t      \t      \t      \t   \t\t   <boardgameversion objectid="25164">German-only first edition</boardgameversion>\n      \t   \t\t   <boardgameversion objectid="24939">German-only second edition</boardgameversion>\n      \t   \t\t   <boardgameartist objectid="12517">Marcus Gschwendtner</boardgameartist>\n      \t   \t\t   <boardgamemechanic objectid="2040">Hand Management</boardgamemechanic>\n      \t   \t\t   <cardset objectid="89777">Hans im Gl\xc3\xbcck German first (1986) and second (1997) editions; Valley Games English third edition (2006)</cardset>\n      \t   \t\t   <boardgamepodcastepisode objectid="123206">Heavy Cardboard Episode 3 \xe2\x80\x93 Die Macher</boardgamepodcastepisode>\n      \t   \t\t   <boardgamepodcastepisode objectid="170757">Heavy Cardboard Episode 39 \xe2\x80\x93 Top 50 Favorite Games of Right Now</boardgamepodcastepisode>\n      \t   \t\t   <boardgamepodcastepisode objectid="187729">Heavy Cardboard Episode 52 &amp;ndash; Amanda&amp;rsquo;s Top 50 &amp;amp; Edward&amp;rsquo;s Top 50</boardgamepodcastepisode>\n      \t   \t\t   <boardgamepodcastepisode objectid="194403">Heavy Cardboard Episode 59 \xe2\x80\x93 December (2016) Briefing</boardgamepodcastepisode>\n      \t   \t\t   <boardgamepodcastepisode objectid="204382">HLG 20: Dilemma&#039;s &amp;amp; Path</boardgamepodcastepisode>\n      \t   \t\t   <boardgamepodcastepisode objectid="177491">HLG 3: Explosief Materiaal</boardgamepodcastepisode>\n      \t   \t\t   <boardgamepodcastepisode objectid="76638">House Rules 30: Die Macher, Die!</boardgamepodcastepisode>\n      \t   \t\t   <boardgameversion objectid="493943">Korean edition</boardgameversion>\n      \t   \t\t   <boardgameartist objectid="4959">Harald Lieske</boardgameartist>\n      \t   \t\t   <boardgamepodcastepisode objectid="115513">Ludology Episode 76 - I Like Dice To Roll</boardgamepodcastepisode>\n      \t   \t\t   <boardgameversion objectid="24534">Multilingual edition 2006</boardgameversion>\n      \t   \t\t   <boardgamepodcastepisode objectid="328918">N\xc2\xb0112 \xe2\x80\x93 Chroniques</boardgamepodcastepisode>\n      \t      \t   \t\t   <boardgamecategory objectid="1026">Negotiation</boardgamecategory>\n      \t      \t      \t   \t\t   <boardgameversion objectid="502544">Polish edition</boardgameversion>\n      \t   \t\t   <boardgamecategory objectid="1001">Political</boardgamecategory>\n      \t   \t\t   <boardgamefamily objectid="34116">Political: Elections</boardgamefamily>\n      \t   \t\t   <boardgamepublisher objectid="2726">Portal Games</boardgamepublisher>\n      \t      \t      \t      \t      \t      \t      \t   \t\t   <boardgamepodcastepisode objectid="342182">Round 6, Turn 7: &quot;Die Macher&quot; with Jesse</boardgamepodcastepisode>\n      \t      \t      \t      \t   \t\t   <boardgamedesigner objectid="1">Karl-Heinz Schmiel</boardgamedesigner>\n      \t   \t\t   <boardgamefamily objectid="91">Series: Classic Line (Valley Games)</boardgamefamily>\n      \t   \t\t   <boardgamemechanic objectid="2020">Simultaneous Action Selection</boardgamemechanic>\n      \t   \t\t   <boardgameversion objectid="620076">Spanish edition</boardgameversion>\n      \t   \t\t   <boardgamepodcastepisode objectid="101519">Spiel des Jahres 2013</boardgamepodcastepisode>\n      \t      \t      \t   \t\t   <boardgamepublisher objectid="15108">Spielworxx</boardgamepublisher>\n      \t   \t\t   <cardset objectid="110688">Spielworxx and Stronghold Games English and German editions (2019, 2025)</cardset>\n      \t   \t\t   <boardgameversion objectid="455802">Spielworxx English/German edition</boardgameversion>\n      \t   \t\t   <boardgameversion objectid="744081">Spielworxx English/German edition 2025</boardgameversion>\n      \t   \t\t   <boardgamepublisher objectid="39249">sternenschimmermeer</boardgamepublisher>\n      \t   \t\t   <boardgamesubdomain objectid="5497">Strategy Games</boardgamesubdomain>\n      \t      \t   \t\t   <boardgameversion objectid="459325">Stronghold English/German edition</boardgameversion>\n      \t   \t\t   <boardgamepublisher objectid="11652">Stronghold Games</boardgamepublisher>\n      \t   \t\t   <boardgamepodcastepisode objectid="152647">The Good, The Board, and the Ugly Behaviors: Episode 20 \xe2\x80\x9cDealing with Bad Players\xe2\x80\x9d</boardgamepodcastepisode>\n      \t   \t\t   <boardgamepodcastepisode objectid="7430">The Messy Game Room Episode 3</boardgamepodcastepisode>\n      \t   \t\t   <boardgamepodcastepisode objectid="5619">The Spiel #28 - Listener&#039;s Choice</boardgamepodcastepisode>\n      \t      \t   \t\t   <boardgamepublisher objectid="5382">Valley Games, Inc.</boardgamepublisher>\n      \t      \t      \t      \t      \t   \t\t   <boardgamepublisher objectid="8147">YOKA Games</boardgamepublisher>\n      \n   <poll name="suggested_numplayers" title="User Suggested Number of Players" totalvotes="142">\n\t\t\t\n\t\t<results numplayers="1">\t\t\n\t\t\t\t\t<result value="Best" numvotes="0" />\n\t\t\t\t\t<result value="Recommended" numvotes="1" />\n\t\t\t\t\t<result value="Not Recommended" numvotes="89" />\n\t\t\t\t</results>\t\t\t\t\t\n\t\t\t\n\t\t<results numplayers="2">\t\t\n\t\t\t\t\t<result value="Best" numvotes="0" />\n\t\t\t\t\t<result value="Recommended" numvotes="1" />\n\t\t\t\t\t<result value="Not Recommended" numvotes="93" />\n\t\t\t\t</results>\t\t\t\t\t\n\t\t\t\n\t\t<results numplayers="3">\t\t\n\t\t\t\t\t<result value="Best" numvotes="2" />\n\t\t\t\t\t<result value="Recommended" numvotes="28" />\n\t\t\t\t\t<result value="Not Recommended" numvotes="78" />\n\t\t\t\t</results>\t\t\t\t\t\n\t\t\t\n\t\t<results numplayers="4">\t\t\n\t\t\t\t\t<result value="Best" numvotes="26" />\n\t\t\t\t\t<result value="Recommended" numvotes="91" />\n\t\t\t\t\t<result value="Not Recommended" numvotes="9" />\n\t\t\t\t</results>\t\t\t\t\t\n\t\t\t\n\t\t<results numplayers="5">\t\t\n\t\t\t\t\t<result value="Best" numvotes="120" />\n\t\t\t\t\t<result value="Recommended" numvotes="12" />\n\t\t\t\t\t<result value="Not Recommended" numvotes="2" />\n\t\t\t\t</results>\t\t\t\t\t\n\t\t\t\n\t\t<results numplayers="5+">\t\t\n\t\t\t\t\t<result value="Best" numvotes="1" />\n\t\t\t\t\t<result value="Recommended" numvotes="0" />\n\t\t\t\t\t<result value="Not Recommended" numvotes="64" />\n\t\t\t\t</results>\t\t\t\t\t\n\t</poll>\n<poll-summary name="suggested_numplayers"  title="User Suggested Number of Players">\n  <result name="bestwith" value="Best with 5 players" />\n  <result name="recommmendedwith" value="Recommended with 4\xe2\x80\x935 players" />\n</poll-summary>\n\n   <poll name="language_dependence" title="Language Dependence" totalvotes="49">\n\t\t\t\n\t\t<results>\t\t\n\t\t\t\t\t<result level="1" value="No necessary in-game text" numvotes="37" />\n\t\t\t\t\t<result level="2" value="Some necessary text - easily memorized or small crib sheet" numvotes="5" />\n\t\t\t\t\t<result level="3" value="Moderate in-game text - needs crib sheet or paste ups" numvotes="7" />\n\t\t\t\t\t<result level="4" value="Extensive use of text - massive conversion needed to be playable" numvotes="0" />\n\t\t\t\t\t<result level="5" value="Unplayable in another language" numvotes="0" />\n\t\t\t\t</results>\t\t\t\t\t\n\t</poll>\n\n   <poll name="suggested_playerage" title="User Suggested Player Age" totalvotes="32">\n\t\t\t<results>\t\t\n\t\t\t\t\t<result value="2" numvotes="0" />\n\t\t\t\t\t<result value="3" numvotes="0" />\n\t\t\t\t\t<result value="4" numvotes="0" />\n\t\t\t\t\t<result value="5" numvotes="0" />\n\t\t\t\t\t<result value="6" numvotes="0" />\n\t\t\t\t\t<result value="8" numvotes="0" />\n\t\t\t\t\t<result value="10" numvotes="0" />\n\t\t\t\t\t<result value="12" numvotes="6" />\n\t\t\t\t\t<result value="14" numvotes="19" />\n\t\t\t\t\t<result value="16" numvotes="4" />\n\t\t\t\t\t<result value="18" numvotes="2" />\n\t\t\t\t\t<result value="21 and up" numvotes="1" />\n\t\t\t\t</results>\t\t\t\t\t\n\t</poll>\n\n\n   \n\n   \n\n</boardgame>\n\n</boardgames>\n'
+
+bgg_thing_response = b'<?xml version="1.0" encoding="utf-8"?><items termsofuse="https://boardgamegeek.com/xmlapi/termsofuse"><item type="boardgame" id="13"><name type="primary" sortindex="1" value="CATAN" /><name type="alternate" sortindex="1" value="Die Siedler von Catan" /><yearpublished value="1995" /><minplayers value="3" /><maxplayers value="4" /><playingtime value="120" /><statistics page="1"><ratings><usersrated value="100000" /><average value="7.09" /><ranks><rank type="subtype" id="1" name="boardgame" friendlyname="Board Game Rank" value="531" bayesaverage="6.9" /><rank type="family" id="5497" name="strategygames" friendlyname="Strategy Game Rank" value="400" bayesaverage="6.8" /></ranks><averageweight value="2.29" /></ratings></statistics></item><item type="boardgame" id="1"><name type="primary" sortindex="5" value="Die Macher" /><yearpublished value="1986" /><minplayers value="3" /><maxplayers value="5" /><playingtime value="240" /><statistics page="1"><ratings><average value="7.6" /><ranks><rank type="subtype" id="1" name="boardgame" friendlyname="Board Game Rank" value="330" bayesaverage="7.1" /></ranks><averageweight value="4.3" /></ratings></statistics></item><item type="boardgame" id="7"><name type="primary" sortindex="1" value="\xe5\xbe\xb7\xe5\x9b\xbd" /><yearpublished value="0" /><statistics page="1"><ratings><average value="0" /><ranks><rank type="subtype" id="1" name="boardgame" friendlyname="Board Game Rank" value="Not Ranked" bayesaverage="0" /></ranks><averageweight value="0" /></ratings></statistics></item></items>'
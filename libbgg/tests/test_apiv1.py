@@ -5,6 +5,9 @@ from unittest import (
 from unittest.mock import MagicMock
 
 from libbgg.apibase import BGGBase
+from libbgg.apiv1 import BGG
+from libbgg.errors import InvalidInputError
+from libbgg.infodict import InfoDict
 from libbgg.tests.fixtures import bgg_boardgame_response
 
 
@@ -50,3 +53,71 @@ class TestBGGBase(TestCase):
         mock_open.open.return_value.read = MagicMock()
         mock_open.open.return_value.read.return_value = return_value
         return mock_open
+
+
+class TestBGG(TestCase):
+
+    def setUp(self):
+        self.bgg = BGG('abc123')
+
+    def test_get_game_chunked(self):
+        def call(call_type, d, priority=None):
+            ids = call_type.split('/')[1].split(',')
+            games = ''.join('<boardgame objectid="{}"><name>{}</name>'
+                '</boardgame>'.format(i, i) for i in ids)
+            return InfoDict.xml_to_info_dict(
+                '<boardgames>{}</boardgames>'.format(games), strip_errors=True)
+
+        with mock.patch.object(self.bgg, 'call', side_effect=call) as m:
+            res = self.bgg.get_game(range(1, 8), chunk_size=3)
+        self.assertEqual(m.call_count, 3)
+        self.assertEqual(
+            [g.objectid for g in res.boardgames.boardgame],
+            [str(i) for i in range(1, 8)])
+
+    def test_get_game_chunk_error(self):
+        def call(call_type, d, priority=None):
+            if call_type == 'boardgame/1,2':
+                return InfoDict.xml_to_info_dict(
+                    '<error message="down"/>', strip_errors=True)
+            return InfoDict.xml_to_info_dict('<boardgames><boardgame '
+                'objectid="3"/></boardgames>', strip_errors=True)
+
+        with mock.patch.object(self.bgg, 'call', side_effect=call):
+            res = self.bgg.get_game([1, 2, 3], chunk_size=2)
+        self.assertEqual(
+            [g.objectid for g in res.boardgames.boardgame], ['3'])
+
+        with mock.patch.object(self.bgg, 'call', return_value=InfoDict
+                .xml_to_info_dict('<error message="down"/>',
+                strip_errors=True)):
+            res = self.bgg.get_game([1, 2, 3], chunk_size=2)
+        self.assertNotIn('boardgames', res)
+
+    def test_get_game_single_call(self):
+        with mock.patch.object(self.bgg, 'call') as m:
+            self.bgg.get_game([1, 2], stats=True)
+        m.assert_called_once_with('boardgame/1,2',
+            {'stats': 1, 'marketplace': 0})
+
+    def test_iter_thread_messages(self):
+        def call(call_type, d):
+            self.assertEqual(call_type, 'thread/5')
+            end = min(d['start'] + d['count'], 5)
+            articles = ''.join('<article id="{}"><body>x</body></article>'
+                .format(i) for i in range(d['start'], end))
+            return InfoDict.xml_to_info_dict('<thread id="5"><subject>s'
+                '</subject><articles>{}</articles></thread>'.format(articles),
+                strip_errors=True)
+
+        with mock.patch.object(self.bgg, 'call', side_effect=call) as m:
+            ids = [a.id for a in self.bgg.iter_thread_messages(5, count=2)]
+        self.assertEqual(ids, ['0', '1', '2', '3', '4'])
+        self.assertEqual([c[0][1]['start'] for c in m.call_args_list],
+            [0, 2, 4])
+
+    def test_iter_thread_messages_count(self):
+        with mock.patch.object(self.bgg, 'call') as m:
+            with self.assertRaises(InvalidInputError):
+                next(self.bgg.iter_thread_messages(5, count=0))
+        self.assertFalse(m.called)
@@ -0,0 +1,77 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from libbgg.catalog import Catalog, CatalogBuilder
+from libbgg.errors import InvalidInputError
+from libbgg.infodict import InfoDict
+from libbgg.tests.fixtures import bgg_thing_response
+
+
+class TestCatalog(TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'catalog.bin')
+        builder = CatalogBuilder()
+        builder.add_things(
+            InfoDict.xml_to_info_dict(bgg_thing_response, strip_errors=True))
+        builder.add(42, 'Hitchhiker', year=1979, rank=1)
+        builder.write(self.path)
+        self.catalog = Catalog(self.path)
+
+    def tearDown(self):
+        self.catalog.close()
+        self.tmpdir.cleanup()
+
+    def test_lookup(self):
+        self.assertEqual(len(self.catalog), 4)
+        catan = self.catalog[13]
+        self.assertEqual(catan.name, 'CATAN')
+        self.assertEqual(catan.year, 1995)
+        self.assertEqual((catan.min_players, catan.max_players), (3, 4))
+        self.assertEqual(catan.playing_time, 120)
+        self.assertEqual(catan.rank, 531)
+        self.assertAlmostEqual(catan.average, 7.09, places=5)
+        self.assertAlmostEqual(catan.weight, 2.29, places=5)
+        self.assertEqual(self.catalog[7].name, '德国')
+        self.assertEqual(self.catalog[7].rank, 0)
+        self.assertIn(1, self.catalog)
+        self.assertNotIn(2, self.catalog)
+        self.assertIsNone(self.catalog.get(2))
+        with self.assertRaises(KeyError):
+            self.catalog[100]
+        self.assertEqual(list(self.catalog.ids()), [1, 7, 13, 42])
+
+    def test_range_scans(self):
+        self.assertEqual([e.id for e in self.catalog.by_rank(1, 1000)],
+            [42, 1, 13])
+        self.assertEqual([e.id for e in self.catalog.by_rank(2, 400)], [1])
+        self.assertEqual([e.id for e in self.catalog.by_year(1980, 2000)],
+            [1, 13])
+        self.assertEqual(list(self.catalog.by_year(2001, 2020)), [])
+
+    def test_bad_file(self):
+        with open(self.path, 'wb') as fh:
+            fh.write(b'x' * 100)
+        with self.assertRaises(InvalidInputError):
+            Catalog(self.path)
+        open(self.path, 'wb').close()
+        with self.assertRaises(InvalidInputError):
+            Catalog(self.path)
+
+    def test_truncated_file(self):
+        with open(self.path, 'rb') as fh:
+            data = fh.read()
+        for size in (len(data) - 1, 200, 60):
+            with open(self.path, 'wb') as fh:
+                fh.write(data[:size])
+            with self.assertRaises(InvalidInputError):
+                Catalog(self.path)
+
+    def test_long_name_truncated(self):
+        builder = CatalogBuilder()
+        builder.add(1, '\xe9' * 40000)
+        builder.write(self.path)
+        with Catalog(self.path) as cat:
+            self.assertEqual(cat[1].name, '\xe9' * 32767)
@@ -0,0 +1,137 @@
+import _thread
+import io
+import json
+import os
+import tempfile
+import time
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from libbgg.crawl import (
+    CrawlState,
+    Crawler,
+    guild_members,
+    thing_units,
+    user_units,
+)
+from libbgg.infodict import InfoDict
+from libbgg.resilience import Metrics
+
+
+class TestCrawler(TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.state_path = os.path.join(self.tmpdir.name, 'crawl.state')
+        self.bgg = MagicMock()
+        self.bgg.metrics = Metrics()
+        self.bgg._things.side_effect = lambda ids, **kw: {'ids': ids}
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def crawl(self, start, end, chunk=3):
+        out = io.StringIO()
+        state = CrawlState(self.state_path)
+        crawler = Crawler(self.bgg, out, state, concurrency=2,
+            stats_interval=0, stats_out=io.StringIO())
+        try:
+            failed = crawler.run(thing_units(self.bgg, start, end,
+                chunk=chunk, done=state))
+        finally:
+            state.close()
+        return failed, crawler, [json.loads(l) for l in
+            out.getvalue().splitlines()]
+
+    def fetched_ids(self):
+        ids = [i for c in self.bgg._things.call_args_list for i in c[0][0]]
+        self.bgg._things.reset_mock()
+        return sorted(ids)
+
+    def test_resume(self):
+        failed, crawler, lines = self.crawl(1, 7)
+        self.assertEqual(failed, 0)
+        self.assertEqual(sorted(l['unit'] for l in lines),
+            ['boardgame:1-3', 'boardgame:4-6', 'boardgame:7-7'])
+        self.assertEqual(self.fetched_ids(), list(range(1, 8)))
+
+        # Rerunning only fetches the ids which weren't done, whatever the
+        # range or chunk size
+        failed, crawler, lines = self.crawl(1, 10, chunk=4)
+        self.assertEqual([l['unit'] for l in lines], ['boardgame:8-10'])
+        self.assertEqual(self.fetched_ids(), [8, 9, 10])
+
+        failed, crawler, lines = self.crawl(1, 10)
+        self.assertEqual(lines, [])
+        self.assertEqual(self.fetched_ids(), [])
+
+    def test_state_file(self):
+        state = CrawlState(self.state_path)
+        state.mark(['a', 'b'])
+        state.mark(['b', 'c'])
+        state.close()
+        with open(self.state_path) as fh:
+            self.assertEqual(fh.read(), 'a\nb\nc\n')
+        self.assertIn('c', CrawlState(self.state_path))
+
+    def test_failed_units_are_retried(self):
+        self.bgg._things.side_effect = [IOError('down'), {'ids': [1]}]
+        failed, crawler, lines = self.crawl(1, 1)
+        self.assertEqual((failed, lines), (1, []))
+        failed, crawler, lines = self.crawl(1, 1)
+        self.assertEqual((failed, len(lines)), (0, 1))
+        self.assertEqual(crawler.stats()['done'], 1)
+
+    def test_interrupt(self):
+        started = []
+
+        def work(i):
+            started.append(i)
+            time.sleep(0.02)
+            if i == 0:
+                # Ctrl-C while the unit is still running
+                _thread.interrupt_main()
+            time.sleep(0.05)
+            return i
+
+        out = io.StringIO()
+        state = CrawlState(self.state_path)
+        crawler = Crawler(self.bgg, out, state, concurrency=2,
+            stats_interval=0, stats_out=io.StringIO())
+        units = [('u{}'.format(i), ['u{}'.format(i)],
+            (lambda i=i: work(i))) for i in range(60)]
+        with self.assertRaises(KeyboardInterrupt):
+            crawler.run(units)
+        state.close()
+
+        # The queued units were dropped and the ones which were running
+        # when the crawl was interrupted are still checkpointed
+        self.assertLess(len(started), 10)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(sorted(json.loads(l)['unit'] for l in lines),
+            sorted(state.done))
+        self.assertIn('u0', state.done)
+
+    def test_user_units_skipped(self):
+        state = CrawlState(self.state_path)
+        state.mark(['collection:alice'])
+        self.bgg.get_collection.return_value = {}
+        crawler = Crawler(self.bgg, io.StringIO(), state, stats_interval=0,
+            stats_out=io.StringIO())
+        crawler.run(user_units(self.bgg, ['alice', 'bob']))
+        state.close()
+        self.bgg.get_collection.assert_called_once_with('bob')
+        self.assertEqual(crawler.skipped, 1)
+
+    def test_guild_members(self):
+        def page(gid, members, page):
+            count = 25 if page == 1 else 3
+            names = ''.join('<member name="u{}-{}"/>'.format(page, i)
+                for i in range(count))
+            return InfoDict.xml_to_info_dict('<guild id="1"><members>{}'
+                '</members></guild>'.format(names), strip_errors=True)
+
+        self.bgg.get_guilds.side_effect = page
+        names = guild_members(self.bgg, 1)
+        self.assertEqual(len(names), 28)
+        self.assertEqual(self.bgg.get_guilds.call_count, 2)
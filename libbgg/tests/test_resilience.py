@@ -0,0 +1,215 @@
+import threading
+from http.client import RemoteDisconnected
+import time
+from unittest import TestCase, mock
+from unittest.mock import MagicMock
+from urllib.error import HTTPError, URLError
+
+from libbgg.apibase import BGGBase
+from libbgg.errors import CircuitOpenError
+from libbgg.resilience import (
+    CircuitBreaker,
+    HedgePolicy,
+    Metrics,
+    RetryPolicy,
+)
+
+
+def http_error(code, retry_after=None):
+    headers = {'Retry-After': retry_after} if retry_after else {}
+    return HTTPError('http://x', code, 'err', headers, None)
+
+
+def response(body=b'<items/>', code=200):
+    res = MagicMock()
+    res.code = code
+    res.read.return_value = body
+    return res
+
+
+class TestRetryPolicy(TestCase):
+
+    def test_should_retry(self):
+        policy = RetryPolicy(retries=2)
+        self.assertTrue(policy.should_retry(0, 503))
+        self.assertTrue(policy.should_retry(1, 429))
+        self.assertFalse(policy.should_retry(2, 503))
+        self.assertFalse(policy.should_retry(0, 404))
+        self.assertTrue(policy.should_retry(0, None))
+
+    def test_delay(self):
+        policy = RetryPolicy(backoff=1, max_backoff=10)
+        self.assertEqual(policy.delay(0, '3'), 3)
+        self.assertEqual(policy.delay(0, '10'), 10)
+        # A Retry-After past the budget isn't cut short
+        self.assertIsNone(policy.delay(0, '120'))
+        self.assertTrue(2 <= policy.delay(2) <= 4)
+        self.assertEqual(policy.delay(10), 10)
+        self.assertEqual(policy.delay(0, 'Wed, 21 Oct 2015 07:28:00 GMT'),
+            0)
+
+
+class TestCircuitBreaker(TestCase):
+
+    def test_open_and_reset(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+        breaker.failure('thing')
+        breaker.before('thing')
+        breaker.failure('thing')
+        self.assertEqual(breaker.state('thing'), CircuitBreaker.OPEN)
+        with self.assertRaises(CircuitOpenError):
+            breaker.before('thing')
+        # Other endpoints are unaffected
+        breaker.before('search')
+
+        time.sleep(0.06)
+        breaker.before('thing')
+        # Only a single trial call is let through
+        with self.assertRaises(CircuitOpenError):
+            breaker.before('thing')
+        breaker.success('thing')
+        self.assertEqual(breaker.state('thing'), CircuitBreaker.CLOSED)
+
+
+class TestMetrics(TestCase):
+
+    def test_percentile(self):
+        metrics = Metrics()
+        self.assertIsNone(metrics.percentile('thing', 99))
+        for i in range(1, 101):
+            metrics.observe('thing', i / 100.0)
+        self.assertEqual(metrics.percentile('thing', 50), 0.5)
+        self.assertEqual(metrics.percentile('thing', 99), 0.99)
+        self.assertEqual(metrics.samples('thing'), 100)
+
+
+@mock.patch('libbgg.apibase.time.sleep')
+class TestResilientCall(TestCase):
+
+    def setUp(self):
+        self.base = BGGBase('abc123', path_base='xmlapi2',
+            retry=RetryPolicy(retries=2), breaker=CircuitBreaker(3))
+        self.base._opener = MagicMock()
+
+    def test_retry_then_success(self, sleep):
+        self.base._opener.open.side_effect = [http_error(503),
+            http_error(429, '7'), response()]
+        self.assertEqual(self.base.call_raw('thing', {}), b'<items/>')
+        self.assertEqual(sleep.call_args_list[-1], mock.call(7.0))
+        self.assertEqual(self.base.metrics.counter('thing', 'retry'), 2)
+        self.assertEqual(self.base.metrics.counter('thing', 'error'), 2)
+
+    def test_long_retry_after(self, sleep):
+        self.base._opener.open.side_effect = [http_error(429, '120'),
+            response()]
+        with self.assertRaises(HTTPError):
+            self.base.call_raw('thing', {})
+        self.assertEqual(self.base._opener.open.call_count, 1)
+        self.assertFalse(sleep.called)
+
+    def test_no_retry_on_404(self, sleep):
+        self.base._opener.open.side_effect = http_error(404)
+        with self.assertRaises(HTTPError):
+            self.base.call_raw('thing', {})
+        self.assertEqual(self.base._opener.open.call_count, 1)
+
+    def test_breaker_fails_fast(self, sleep):
+        self.base._opener.open.side_effect = URLError('down')
+        with self.assertRaises(URLError):
+            self.base.call_raw('thing', {})
+        with self.assertRaises(CircuitOpenError):
+            self.base.call_raw('thing', {})
+        self.assertEqual(self.base._opener.open.call_count, 3)
+        self.assertEqual(self.base.metrics.counter('thing', 'fast_fail'), 1)
+
+    def test_dropped_connection_retried(self, sleep):
+        self.base._opener.open.side_effect = [ConnectionResetError(),
+            RemoteDisconnected('closed'), response()]
+        self.assertEqual(self.base.call_raw('thing', {}), b'<items/>')
+        self.assertEqual(self.base.metrics.counter('thing', 'retry'), 2)
+
+    def test_dropped_connection_during_trial(self, sleep):
+        self.base.retry = None
+        self.base.breaker = CircuitBreaker(1, reset_timeout=0)
+        self.base._opener.open.side_effect = URLError('down')
+        with self.assertRaises(URLError):
+            self.base.call_raw('thing', {})
+
+        # The trial call fails with an error urllib doesn't wrap
+        self.base._opener.open.side_effect = RemoteDisconnected('closed')
+        with self.assertRaises(RemoteDisconnected):
+            self.base.call_raw('thing', {})
+        self.assertNotIn('thing', self.base.breaker._trial)
+
+        # The next trial goes through and closes the circuit
+        self.base._opener.open.side_effect = None
+        self.base._opener.open.return_value = response()
+        self.assertEqual(self.base.call_raw('thing', {}), b'<items/>')
+        self.assertEqual(self.base.breaker.state('thing'),
+            CircuitBreaker.CLOSED)
+
+    def test_unexpected_error_frees_trial(self, sleep):
+        self.base.breaker = CircuitBreaker(1, reset_timeout=0)
+        self.base.breaker.failure('thing')
+        self.base._opener.open.side_effect = KeyError('boom')
+        with self.assertRaises(KeyError):
+            self.base.call_raw('thing', {})
+        self.assertNotIn('thing', self.base.breaker._trial)
+
+    def test_wait_202(self, sleep):
+        self.base._opener.open.side_effect = [response(code=202),
+            response()]
+        self.base.call_raw('collection', {'username': 'x'}, wait=True)
+        self.assertEqual(
+            self.base.metrics.counter('collection', 'wait_202'), 1)
+
+
+class TestHedging(TestCase):
+
+    def test_hedge_wins(self):
+        base = BGGBase('abc123', path_base='xmlapi2',
+            hedge=HedgePolicy(percentile=50, min_samples=1, min_delay=0.01))
+        base.metrics.observe('thing', 0.01)
+        release = threading.Event()
+        calls = []
+
+        def slow_then_fast(url):
+            calls.append(url)
+            if len(calls) == 1:
+                release.wait(2)
+                return response(b'slow')
+            return response(b'fast')
+
+        base._opener = MagicMock()
+        base._opener.open.side_effect = slow_then_fast
+        try:
+            self.assertEqual(base.call_raw('thing', {}), b'fast')
+        finally:
+            release.set()
+        self.assertEqual(base.metrics.counter('thing', 'hedge'), 1)
+        self.assertEqual(base.metrics.counter('thing', 'hedge_win'), 1)
+
+    def test_hedge_skipped_without_free_worker(self):
+        base = BGGBase('abc123', path_base='xmlapi2',
+            hedge=HedgePolicy(percentile=50, min_samples=1, min_delay=0.01,
+            workers=2))
+        base.metrics.observe('thing', 0.01)
+        release = threading.Event()
+
+        def open_url(url):
+            if url == 'http://busy':
+                release.wait(2)
+                return response(b'slow')
+            return response(b'inline')
+
+        base._opener = MagicMock()
+        base._opener.open.side_effect = open_url
+        # Hold both hedge workers
+        base._submit_hedge('http://busy', 'thing')
+        base._submit_hedge('http://busy', 'thing')
+        try:
+            self.assertEqual(base.call_raw('thing', {}), b'inline')
+        finally:
+            release.set()
+        self.assertEqual(base.metrics.counter('thing', 'hedge'), 0)
+        self.assertEqual(base.metrics.counter('thing', 'hedge_skipped'), 1)
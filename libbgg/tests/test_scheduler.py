@@ -0,0 +1,153 @@
+import threading
+import time
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from libbgg.apibase import BGGBase
+from libbgg.apiv1 import BGG
+from libbgg.errors import (
+    DeadlineExceededError,
+    InvalidInputError,
+    SchedulerFullError,
+)
+from libbgg.resilience import HedgePolicy
+from libbgg.scheduler import PriorityClass, RequestScheduler
+
+
+class TestRequestScheduler(TestCase):
+
+    def test_classify(self):
+        sched = RequestScheduler()
+        self.assertEqual(sched.classify('search'), 'interactive')
+        self.assertEqual(sched.classify('thing'), 'batch')
+        # The hot lists are mostly polled in the background
+        self.assertEqual(sched.classify('hot'), 'batch')
+        with sched.priority('interactive'):
+            self.assertEqual(sched.classify('thing'), 'interactive')
+        self.assertEqual(sched.classify('thing'), 'batch')
+        with self.assertRaises(InvalidInputError):
+            RequestScheduler(default_class='bogus')
+
+    def test_weighted_share(self):
+        sched = RequestScheduler(rate=None, max_inflight=1, classes={
+            'interactive': PriorityClass(weight=3),
+            'batch': PriorityClass(weight=1),
+        })
+        order = []
+        gate = threading.Event()
+
+        def worker(cls):
+            with sched.slot(priority=cls):
+                order.append(cls)
+
+        # Hold the only slot so that both classes queue up behind it
+        holder = threading.Thread(target=lambda: sched.run(gate.wait,
+            priority='batch'), daemon=True)
+        holder.start()
+        while sched.stats()['inflight'] == 0:
+            time.sleep(0.001)
+
+        threads = []
+        for cls in ['batch'] * 4 + ['interactive'] * 6:
+            t = threading.Thread(target=worker, args=(cls,), daemon=True)
+            t.start()
+            threads.append(t)
+        while sum(sched.stats()[c]['queued'] for c in
+                ('batch', 'interactive')) < 10:
+            time.sleep(0.001)
+        gate.set()
+        for t in threads + [holder]:
+            t.join(2)
+
+        # Interactive gets 3 slots to each batch slot while both are
+        # waiting, and batch gets all the capacity once interactive is done
+        self.assertEqual(order, ['interactive'] * 4 + ['batch'] +
+            ['interactive'] * 2 + ['batch'] * 3)
+        sched.close()
+
+    def test_deadline_and_full(self):
+        sched = RequestScheduler(rate=None, max_inflight=1, classes={
+            'batch': PriorityClass(max_queue=1),
+        }, endpoint_classes={})
+        gate = threading.Event()
+        holder = threading.Thread(target=lambda: sched.run(gate.wait),
+            daemon=True)
+        holder.start()
+        while sched.stats()['inflight'] == 0:
+            time.sleep(0.001)
+
+        with self.assertRaises(DeadlineExceededError):
+            sched.run(lambda: None, deadline=0.02)
+        # The expired request doesn't hold up the queue
+        waiter = threading.Thread(target=lambda: sched.run(lambda: None),
+            daemon=True)
+        waiter.start()
+        while sched.stats()['batch']['queued'] == 0:
+            time.sleep(0.001)
+        with self.assertRaises(SchedulerFullError):
+            sched.run(lambda: None, deadline=1)
+        gate.set()
+        holder.join(2)
+        waiter.join(2)
+        stats = sched.stats()['batch']
+        self.assertEqual((stats['granted'], stats['expired'],
+            stats['rejected']), (2, 1, 1))
+        sched.close()
+
+    def test_rate_limit(self):
+        sched = RequestScheduler(rate=50, burst=1)
+        start = time.monotonic()
+        for _ in range(4):
+            sched.run(lambda: None)
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+        sched.close()
+
+    def test_base_call(self):
+        sched = RequestScheduler(rate=None)
+        base = BGGBase('abc123', path_base='xmlapi2', scheduler=sched)
+        base._opener = MagicMock()
+        base._opener.open.return_value.code = 200
+        base._opener.open.return_value.read.return_value = b'<items/>'
+        self.assertEqual(base.call_raw('search', {'query': 'x'}), b'<items/>')
+        self.assertEqual(sched.stats()['interactive']['granted'], 1)
+        sched.close()
+
+    def test_priority_passed_to_call_many_threads(self):
+        sched = RequestScheduler(rate=None)
+        bgg = BGG('abc123', scheduler=sched)
+        bgg._opener = MagicMock()
+        bgg._opener.open.return_value.code = 200
+        bgg._opener.open.return_value.read.return_value = \
+            b'<boardgames><boardgame objectid="1"/></boardgames>'
+        with sched.priority('interactive'):
+            bgg.get_game(range(1, 50), chunk_size=10)
+        self.assertEqual(sched.stats()['interactive']['granted'], 5)
+        self.assertEqual(sched.stats()['batch']['granted'], 0)
+        sched.close()
+
+    def test_hedge_needs_a_slot(self):
+        sched = RequestScheduler(rate=None, max_inflight=1)
+        base = BGGBase('abc123', path_base='xmlapi2', scheduler=sched,
+            hedge=HedgePolicy(percentile=50, min_samples=1, min_delay=0.01))
+        base.metrics.observe('thing', 0.01)
+        base._opener = MagicMock()
+
+        def slow(url):
+            time.sleep(0.1)
+            return MagicMock(code=200, read=MagicMock(return_value=b'ok'))
+
+        base._opener.open.side_effect = slow
+        self.assertEqual(base.call_raw('thing', {}), b'ok')
+        # The only slot was held by the primary, so there was no hedge
+        self.assertEqual(base._opener.open.call_count, 1)
+        self.assertEqual(base.metrics.counter('thing', 'hedge_skipped'), 1)
+        self.assertEqual(sched.stats()['inflight'], 0)
+
+        # With room in the budget, the hedge takes a slot of its own
+        sched.max_inflight = 2
+        base.call_raw('thing', {})
+        self.assertEqual(base.metrics.counter('thing', 'hedge'), 1)
+        self.assertEqual(sched.stats()['batch']['granted'], 3)
+        time.sleep(0.15)
+        self.assertEqual(sched.stats()['inflight'], 0)
+        sched.close()
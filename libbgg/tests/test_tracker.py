@@ -0,0 +1,83 @@
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+from urllib.error import URLError
+
+from libbgg.apiv2 import BGG
+from libbgg.tracker import ChangeTracker, RankDiff
+from libbgg.tests.fixtures import bgg_thing_response
+
+
+def hot_response(*items):
+    body = ''.join('<item id="{}" rank="{}"><name value="Game {}"/></item>'
+        .format(gid, rank, gid) for gid, rank in items)
+    return '<items termsofuse="x">{}</items>'.format(body).encode('utf-8')
+
+
+class TestChangeTracker(TestCase):
+
+    def setUp(self):
+        self.bgg = BGG('abc123')
+        self.bgg.call_raw = MagicMock()
+        self.tracker = ChangeTracker(self.bgg, hot_types=('boardgame',))
+        self.seen = []
+        self.tracker.subscribe(self.seen.append)
+
+    def test_hot_diff(self):
+        self.bgg.call_raw.return_value = hot_response((1, 1), (2, 2), (3, 3))
+        diffs = self.tracker.poll()
+        self.assertEqual(len(diffs[0].entered), 3)
+        self.assertEqual(self.seen, diffs)
+
+        self.bgg.call_raw.return_value = hot_response((2, 1), (1, 2), (4, 3))
+        diff = self.tracker.poll()[0]
+        self.assertEqual(diff, RankDiff('boardgame', [(4, 3, 'Game 4')],
+            [(3, 3, 'Game 3')], [(2, 2, 1), (1, 1, 2)]))
+        self.assertEqual(len(self.seen), 2)
+
+    def test_subscriber_error(self):
+        def fail(diff):
+            raise ValueError('oops')
+
+        self.tracker.subscribe(fail)
+        self.bgg.call_raw.return_value = hot_response((1, 1))
+        with self.assertRaises(ValueError):
+            self.tracker.poll()
+        # The diff isn't lost, the next poll emits it again
+        self.tracker.unsubscribe(fail)
+        self.assertEqual(self.tracker.poll(), self.seen[-1:])
+        self.assertEqual(self.seen[-1].entered, [(1, 1, 'Game 1')])
+
+    @patch('libbgg.tracker.InfoDict')
+    def test_unchanged_body_not_parsed(self, info_dict):
+        info_dict.xml_to_info_dict.return_value = {}
+        self.bgg.call_raw.return_value = hot_response((1, 1))
+        self.tracker.poll()
+        self.assertEqual(self.tracker.poll(), [])
+        self.assertEqual(info_dict.xml_to_info_dict.call_count, 1)
+
+    def test_ranks(self):
+        tracker = ChangeTracker(self.bgg, hot_types=(), game_ids=(1, 7, 13))
+        self.bgg.call_raw.return_value = bgg_thing_response
+        diff = tracker.poll_ranks()
+        self.assertEqual(diff.entered, [(1, 330, 'Die Macher'),
+            (13, 531, 'CATAN')])
+        self.assertIsNone(tracker.poll_ranks())
+        self.bgg.call_raw.return_value = bgg_thing_response.replace(
+            b'value="531"', b'value="500"')
+        self.assertEqual(tracker.poll_ranks().moved, [(13, 531, 500)])
+
+    def test_ranks_failed_batch(self):
+        ids = [13] + list(range(100, 120))
+        tracker = ChangeTracker(self.bgg, hot_types=(), game_ids=ids)
+        other = b'<items termsofuse="x"></items>'
+        self.bgg.call_raw.side_effect = [bgg_thing_response, other]
+        tracker.poll_ranks()
+
+        # The first batch changes, but the second one fails
+        moved = bgg_thing_response.replace(b'value="531"', b'value="500"')
+        self.bgg.call_raw.side_effect = [moved, URLError('down')]
+        with self.assertRaises(URLError):
+            tracker.poll_ranks()
+        # The change is still emitted by the next poll
+        self.bgg.call_raw.side_effect = [moved, other]
+        self.assertEqual(tracker.poll_ranks().moved, [(13, 531, 500)])
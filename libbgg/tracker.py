@@ -0,0 +1,241 @@
+import hashlib
+import time
+from collections import namedtuple
+
+from libbgg.apiv2 import THING_BATCH
+from libbgg.errors import InvalidInputError
+from libbgg.infodict import InfoDict, as_list
+
+__all__ = ['ChangeTracker', 'RankDiff']
+
+"""
+Tracks changes in the hot lists and in the ranks of a set of games.
+
+Rather than handing the full payload to the caller on every poll, the
+tracker keeps the previous snapshot for each list and only emits the
+differences.  Before a response is parsed its raw body is hashed and
+compared to the previous body, so polling a list which hasn't changed
+costs a request and a hash, nothing more.
+
+Example:
+
+from libbgg.apiv2 import BGG
+from libbgg.tracker import ChangeTracker
+
+tracker = ChangeTracker(BGG(API_KEY), hot_types=('boardgame', 'rpg'),
+    game_ids=(13, 822))
+tracker.subscribe(print)
+
+for diff in tracker.iter_changes(interval=300):
+    for gid, old_rank, new_rank in diff.moved:
+        print(diff.key, gid, old_rank, '->', new_rank)
+"""
+
+# key:str           The hot type, or "rank" for the tracked games
+# entered:list      (id, rank, name) for items new to the list
+# exited:list       (id, old_rank, name) for items which left the list
+# moved:list        (id, old_rank, new_rank) for items which changed rank
+RankDiff = namedtuple('RankDiff', ('key', 'entered', 'exited', 'moved'))
+
+RANK_KEY = 'rank'
+
+
+def _name(item):
+    for n in as_list(item.get('name')):
+        if n.get('type', 'primary') == 'primary':
+            return n.get('value')
+    return None
+
+
+def diff_snapshots(key, old, new):
+    """
+    Compute the RankDiff between two snapshots, each a mapping of
+    id -> (rank, name).  Returns None if nothing changed.
+
+    key:str             The key for the resulting diff
+    old:dict            The previous snapshot
+    new:dict            The current snapshot
+    """
+    entered = [(gid, rank, name) for gid, (rank, name) in new.items()
+        if gid not in old]
+    exited = [(gid, rank, name) for gid, (rank, name) in old.items()
+        if gid not in new]
+    moved = [(gid, old[gid][0], rank) for gid, (rank, _) in new.items()
+        if gid in old and old[gid][0] != rank]
+
+    if not (entered or exited or moved):
+        return None
+
+    entered.sort(key=lambda e: e[1])
+    exited.sort(key=lambda e: e[1])
+    moved.sort(key=lambda e: e[2])
+
+    return RankDiff(key, entered, exited, moved)
+
+
+class ChangeTracker(object):
+    """
+    Polls the hot lists and tracked game ranks and emits only the changes
+    since the previous poll to the subscribers
+    """
+
+    def __init__(self, bgg, hot_types=None, game_ids=None):
+        """
+        bgg:libbgg.apiv2.BGG        The v2 api instance to poll with
+        hot_types:list[str]         The hot types to track.  Defaults to
+                                    all of BGG.hot_types
+        game_ids:list[int]          The game ids to track the ranks of
+        """
+        self.bgg = bgg
+        self.hot_types = tuple(hot_types if hot_types is not None
+            else bgg.hot_types)
+        invalid = set(self.hot_types) - set(bgg.hot_types)
+        if invalid:
+            raise InvalidInputError('hot_types must be one of {}'.format(
+                ', '.join(bgg.hot_types)))
+        self.game_ids = [int(gid) for gid in (game_ids or [])]
+        self._subscribers = []
+        # key -> digest of the last raw body seen
+        self._hashes = {}
+        # key -> parsed snapshot for the last raw body seen
+        self._parsed = {}
+        # hot type or RANK_KEY -> the last snapshot emitted
+        self._snapshots = {}
+
+    def subscribe(self, callback):
+        """
+        Register a callable to be called with each RankDiff
+
+        callback:callable   Called as callback(diff)
+        """
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        self._subscribers.remove(callback)
+
+    def poll(self):
+        """
+        Poll all the tracked lists once, notify the subscribers and return
+        the list of RankDiffs for the lists which changed
+        """
+        diffs = [self.poll_hot(hot_type) for hot_type in self.hot_types]
+        if self.game_ids:
+            diffs.append(self.poll_ranks())
+
+        return [d for d in diffs if d is not None]
+
+    def iter_changes(self, interval=60):
+        """
+        Poll forever, every interval seconds, yielding each RankDiff as it
+        is found
+
+        interval:float      The number of seconds between polls
+        """
+        while True:
+            start = time.monotonic()
+            for diff in self.poll():
+                yield diff
+            time.sleep(max(0, interval - (time.monotonic() - start)))
+
+    def poll_hot(self, hot_type):
+        """
+        Poll the hot list for a single type.  Returns the RankDiff or None
+        if the list is unchanged.
+
+        hot_type:str        The hot type to poll
+        """
+        digest, snap = self._fetch(hot_type, 'hot', {'type': hot_type},
+            self._parse_hot)
+        if snap is None:
+            return None
+
+        diff = self._emit(hot_type, snap)
+        self._commit(hot_type, digest, snap)
+
+        return diff
+
+    def poll_ranks(self):
+        """
+        Poll the boardgame ranks of the tracked game ids.  Games without a
+        rank are treated as not on the list.  Returns the RankDiff or None
+        if no rank changed.
+        """
+        changed = False
+        parts = []
+        for i in range(0, len(self.game_ids), THING_BATCH):
+            ids = self.game_ids[i:i + THING_BATCH]
+            key = (RANK_KEY, tuple(ids))
+            d = {'id': ','.join(str(gid) for gid in ids),
+                'type': 'boardgame', 'stats': 1}
+            digest, part = self._fetch(key, 'thing', d, self._parse_ranks)
+            if part is None:
+                part = self._parsed[key]
+            else:
+                changed = True
+            parts.append((key, digest, part))
+
+        if not changed:
+            return None
+
+        snap = {}
+        for _, _, part in parts:
+            snap.update(part)
+        diff = self._emit(RANK_KEY, snap)
+        # Only remember the bodies once every batch was fetched and the
+        # diff went out, otherwise a failed poll would hide the change
+        for key, digest, part in parts:
+            self._commit(key, digest, part)
+
+        return diff
+
+    def _fetch(self, key, call_type, call_dict, parse):
+        """
+        Fetch the raw body and parse it into a snapshot, unless it is byte
+        for byte identical to the last body seen for key, in which case
+        the snapshot is None.  Returns (digest, snapshot), which should be
+        passed to _commit() once the snapshot has been emitted.
+        """
+        body = self.bgg.call_raw(call_type, call_dict)
+        digest = hashlib.sha1(body).digest()
+        if self._hashes.get(key) == digest:
+            return digest, None
+
+        return digest, parse(InfoDict.xml_to_info_dict(body,
+            strip_errors=True))
+
+    def _commit(self, key, digest, snap):
+        self._hashes[key] = digest
+        self._parsed[key] = snap
+
+    def _emit(self, key, snap):
+        diff = diff_snapshots(key, self._snapshots.get(key, {}), snap)
+        if diff is not None:
+            for callback in list(self._subscribers):
+                callback(diff)
+        # Only move on to the new snapshot once every subscriber has it, if
+        # one raises the diff is emitted again by the next poll
+        self._snapshots[key] = snap
+
+        return diff
+
+    @staticmethod
+    def _parse_hot(res):
+        snap = {}
+        for item in as_list((res.get('items') or {}).get('item')):
+            snap[int(item['id'])] = (int(item['rank']), _name(item))
+
+        return snap
+
+    @staticmethod
+    def _parse_ranks(res):
+        snap = {}
+        for item in as_list((res.get('items') or {}).get('item')):
+            ranks = (item.get('statistics') or {}).get('ratings') or {}
+            ranks = ranks.get('ranks') or {}
+            for r in as_list(ranks.get('rank')):
+                if r.get('name') == 'boardgame' and \
+                        r.get('value', '').isdigit():
+                    snap[int(item['id'])] = (int(r['value']), _name(item))
+                    break
+
+        return snap
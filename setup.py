@@ -31,6 +31,11 @@ setup(name='py-bgg',
         'and converts the XML to representative dict/list format',
     packages=['libbgg'],
     package_dir={'libbgg': 'libbgg'},
+    entry_points={
+        'console_scripts': [
+            'bgg-crawl=libbgg.crawl:main',
+        ],
+    },
     classifiers=[
         'Development Status :: 4 - Beta',
         'Intended Audience :: System Administrators',